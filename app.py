@@ -6,32 +6,54 @@ from src.pages.timeseries.pages_timeseries import render_country_page
 from src.pages.advanced.pages_advanced import render_advanced_analysis_page
 
 
+# Sidebar page table: label -> renderer. Pages listed in FILTERED_PAGES also receive the
+# sidebar year/continent selection.
+PAGES = {
+    "Overview": render_overview,
+    "Timeseries Analysis": render_country_page,
+    "Advanced Analysis": render_advanced_analysis_page,
+}
+FILTERED_PAGES = {"Overview"}
+
+# Data directory handed to `load_data`; every page takes it and reads `load_data(DATA_DIR)`
+# through its caches
+DATA_DIR = "data"
+
+
+@st.cache_data(show_spinner=False)
+def _sidebar_options(data_dir: str = "data"):
+    """Return the (years, continents) option lists for the sidebar controls.
+
+    Keyed on `data_dir` like `load_data`, so the options are derived once per
+    process instead of on every widget interaction.
+    """
+    df = load_data(data_dir)
+    years = sorted(df["year"].unique().tolist())
+    continents = sorted(df["continent_name"].dropna().unique())
+    return years, continents
+
+
 def main():
     st.set_page_config(layout="wide", page_title="CO2 Emissions dashboard")
     st.title("CO2 Emissions Dashboard")
 
-    df = load_data()
-
     # Controls
-    years = sorted(df["year"].dropna().astype(int).unique())
+    years, continents = _sidebar_options(DATA_DIR)
     # allow selecting multiple years; visualizations will aggregate across selected years
     selected_years = st.sidebar.multiselect("Years", options=years, default=[max(years)], key="years")
 
-    continents = sorted(df["continent_name"].dropna().unique())
     selected_continents = st.sidebar.multiselect("Continent", options=continents, default=continents, key="continents")
 
     st.sidebar.markdown("---")
     st.sidebar.markdown("Data: Our World in Data CO2 dataset")
 
     # Page navigation
-    page = st.sidebar.radio("Page", ["Overview", "Timeseries Analysis", "Advanced Analysis"]) 
+    page = st.sidebar.radio("Page", list(PAGES))
 
-    if page == "Overview":
-        render_overview(df, selected_years, selected_continents)
-    elif page == "Timeseries Analysis":
-        render_country_page(df)
+    if page in FILTERED_PAGES:
+        PAGES[page](DATA_DIR, selected_years, selected_continents)
     else:
-        render_advanced_analysis_page(df)
+        PAGES[page](DATA_DIR)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+"""Convert the OWID CO2 CSV into a Parquet copy for faster loading.
+
+Produces:
+- `data/owid-co2-data.parquet` (zstd-compressed, all columns)
+
+`src.data_loader.load_data` reads the Parquet file instead of the CSV when it
+exists and is newer than the CSV.
+
+Run from project root:
+    python scripts/csv_to_parquet.py
+"""
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+
+def csv_to_parquet(data_dir: Path = ROOT / "data"):
+    """Write `owid-co2-data.parquet` next to `owid-co2-data.csv` in `data_dir`."""
+    src = data_dir / "owid-co2-data.csv"
+    dst = data_dir / "owid-co2-data.parquet"
+
+    df = pd.read_csv(src)
+    df.to_parquet(dst, compression="zstd", index=False)
+    logging.info(f"Wrote {len(df)} rows x {len(df.columns)} columns to {dst}")
+
+
+if __name__ == "__main__":
+    csv_to_parquet()
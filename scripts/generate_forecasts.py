@@ -1,8 +1,9 @@
-"""Generate forecasts for `co2_per_capita` per country and save outputs.
+"""Generate per-country forecasts for `co2` and `gdp`, plus a global CO2 total forecast.
 
 Produces:
-- `data/forecasts_co2_per_capita.csv` with observed + forecast + 95% CI
-- `data/forecasts_plots/{country}.html` per-country interactive Plotly plot
+- `data/forecasts_{metric}.csv` (`forecasts_co2.csv`, `forecasts_gdp.csv`) with observed + forecast + 95% CI
+- `data/forecasts_plots/{country}_{metric}.html` per-country interactive Plotly plot
+- `data/forecasts_global_co2.csv` and `data/forecasts_plots/global_co2.html` for the global total
 
 Run from project root:
     python scripts/generate_forecasts.py
@@ -10,8 +11,11 @@ Run from project root:
 import os
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 # Ensure project src is importable when script is run from project root
@@ -22,24 +26,133 @@ from src.data_loader import load_data
 from src.pages.timeseries.forecast import forecast_series
 from src.pages.timeseries.viz_timeseries import country_forecast_plot
 import plotly.graph_objects as go
+import plotly.io as pio
+
+# Serialize figure JSON with the orjson C extension (see requirements.txt)
+pio.json.config.default_engine = "orjson"
 
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
+# Countries sent to a worker process per task; batching amortizes the per-task pickling
+# and scheduling overhead over several SARIMAX fits
+BATCH_SIZE = 8
+
 
 def _safe_filename(name: str) -> str:
     return "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in name).strip()
 
 
-def generate_forecasts(metrics: list | None = None, steps: int = 5, min_points: int = 6):
+def _write_plot(fig: go.Figure, fname: Path, country: str, metric: str):
+    try:
+        fig.write_html(str(fname), include_plotlyjs="cdn")
+    except Exception as e:
+        logging.warning(f"Failed to create plot for {country} ({metric}): {e}")
+
+
+def _forecast_country(country: str, cdf: pd.DataFrame, metric: str, steps: int, min_points: int, plots_dir: Path,
+                      writer: ThreadPoolExecutor | None = None):
+    """Forecast `metric` for a single country and write its interactive plot.
+
+    `cdf` holds the country's rows ordered by year. If `writer` is given, the plot HTML is
+    written on that executor instead of inline. Returns the forecast DataFrame (with
+    identifiers attached), or None when the country is skipped or the forecast fails.
+    """
+    years = cdf["year"].astype(int)
+    values = cdf.get(metric)
+    if values is None:
+        # Metric not present for this dataset
+        logging.debug(f"Metric '{metric}' not found for country {country}; skipping")
+        return None
+    non_null = values.dropna()
+    if non_null.shape[0] < min_points:
+        logging.info(f"Skipping {country}: only {non_null.shape[0]} non-missing points for metric '{metric}'")
+        return None
+
+    try:
+        fdf = forecast_series(years, values, steps=steps)
+    except Exception as e:
+        logging.warning(f"Forecast failed for {country} ({metric}): {e}")
+        return None
+
+    # Attach identifiers (load_data keeps only rows with an ISO code, shared per country)
+    fdf["country"] = country
+    fdf["iso_code"] = cdf["iso_code"].iat[0]
+    fdf["metric"] = metric
+
+    # Save per-country interactive plot
+    try:
+        fig = country_forecast_plot(cdf, country, metric=metric, steps=steps, forecast_df=fdf)
+    except Exception as e:
+        logging.warning(f"Failed to create plot for {country} ({metric}): {e}")
+        return fdf
+    fname = plots_dir / f"{_safe_filename(country)}_{metric}.html"
+    if writer is None:
+        _write_plot(fig, fname, country, metric)
+    else:
+        writer.submit(_write_plot, fig, fname, country, metric)
+
+    return fdf
+
+
+def _forecast_batch(batch: list, metric: str, steps: int, min_points: int, plots_dir: Path) -> list:
+    """Forecast a batch of `(country, cdf)` pairs in a worker process.
+
+    Plot files are written on a background thread so each write overlaps with the next
+    country's model fit; all writes have finished when the batch returns.
+    """
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        return [
+            _forecast_country(country, cdf, metric, steps, min_points, plots_dir, writer=writer)
+            for country, cdf in batch
+        ]
+
+
+def _stack_forecasts(frames: list, metric: str) -> pd.DataFrame:
+    """Stack per-country forecast frames into a single DataFrame.
+
+    The output columns are allocated once at the total row count and each country's rows
+    are written into their slice, so no intermediate concatenated copy is built.
+    Countries are stored as integer codes while filling and expanded to names at the end.
+    """
+    n_total = sum(len(fdf) for fdf in frames)
+    years = np.empty(n_total, dtype=np.int64)
+    values = {col: np.empty(n_total, dtype=np.float64) for col in ("y", "y_pred", "y_lower", "y_upper")}
+    country_codes = np.empty(n_total, dtype=np.int32)
+    names, iso_codes = [], []
+
+    offset = 0
+    for code, fdf in enumerate(frames):
+        rows = slice(offset, offset + len(fdf))
+        years[rows] = fdf["year"].to_numpy()
+        for col, arr in values.items():
+            arr[rows] = fdf[col].to_numpy()
+        country_codes[rows] = code
+        names.append(fdf["country"].iat[0])
+        iso_codes.append(fdf["iso_code"].iat[0])
+        offset += len(fdf)
+
+    return pd.DataFrame({
+        "year": years,
+        **values,
+        "country": np.asarray(names, dtype=object)[country_codes],
+        "iso_code": np.asarray(iso_codes, dtype=object)[country_codes],
+        "metric": metric,
+    })
+
+
+def generate_forecasts(metrics: list | None = None, steps: int = 5, min_points: int = 6, n_jobs: int | None = None,
+                       batch_size: int = BATCH_SIZE):
     """Generate per-country forecasts for the requested metrics and a global CO2 total forecast.
 
     By default this generates forecasts for `co2` and `gdp` for every country (when available),
     and additionally generates a single global CO2 total forecast (aggregate across countries by year).
+    Countries are forecast in parallel across `n_jobs` worker processes (default: one per CPU),
+    `batch_size` countries per worker task.
 
     Results:
     - `data/forecasts_{metric}.csv` per-metric per-country forecasts
-    - `data/forecasts_plots/{country}.html` per-country plots
+    - `data/forecasts_plots/{country}_{metric}.html` per-country plots
     - `data/forecasts_global_co2.csv` and `data/forecasts_plots/global_co2.html` for global CO2
     """
     if metrics is None:
@@ -50,57 +163,48 @@ def generate_forecasts(metrics: list | None = None, steps: int = 5, min_points:
     plots_dir = ROOT / "data" / "forecasts_plots"
     plots_dir.mkdir(parents=True, exist_ok=True)
 
-    countries = sorted(df["country"].dropna().unique())
-
-    for metric in metrics:
-        out_rows = []
-        logging.info(f"Found {len(countries)} countries; computing forecasts for metric '{metric}'")
-
-        for country in countries:
-            cdf = df[df["country"] == country].sort_values("year")
-            years = cdf["year"].astype(int)
-            values = cdf.get(metric)
-            if values is None:
-                # Metric not present for this dataset
-                logging.debug(f"Metric '{metric}' not found for country {country}; skipping")
-                continue
-            non_null = values.dropna()
-            if non_null.shape[0] < min_points:
-                logging.info(f"Skipping {country}: only {non_null.shape[0]} non-missing points for metric '{metric}'")
+    # Count non-missing points per country up front so countries too short to forecast
+    # for any metric are never sorted, split, or shipped to a worker
+    present = [m for m in metrics if m in df.columns]
+    counts = df.groupby("country", observed=True)[present].count()
+    keep = counts.index[(counts >= min_points).any(axis=1)]
+
+    # Sort once and split once: each worker receives only its country's rows, already
+    # ordered by year, and countries come out in alphabetical order
+    df_sorted = df[df["country"].isin(keep)].sort_values(["country", "year"], kind="stable")
+    groups = dict(list(df_sorted.groupby("country", sort=False, observed=True)))
+
+    # Workers are reused across metrics
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        for metric in metrics:
+            if metric not in counts.columns:
+                logging.warning(f"No forecasts were generated for metric '{metric}'")
                 continue
 
-            try:
-                fdf = forecast_series(years, values, steps=steps)
-            except Exception as e:
-                logging.warning(f"Forecast failed for {country} ({metric}): {e}")
+            for country in counts.index[counts[metric] < min_points]:
+                logging.info(f"Skipping {country}: only {counts.at[country, metric]} non-missing points for metric '{metric}'")
+            countries = counts.index[counts[metric] >= min_points].tolist()
+            logging.info(f"Found {len(countries)} countries; computing forecasts for metric '{metric}'")
+            batches = [
+                [(c, groups[c]) for c in countries[i:i + batch_size]]
+                for i in range(0, len(countries), batch_size)
+            ]
+
+            results = pool.map(
+                partial(_forecast_batch, metric=metric, steps=steps, min_points=min_points, plots_dir=plots_dir),
+                batches,
+            )
+            out_rows = [fdf for batch in results for fdf in batch if fdf is not None]
+
+            if not out_rows:
+                logging.warning(f"No forecasts were generated for metric '{metric}'")
                 continue
 
-            # Attach identifiers
-            iso = cdf["iso_code"].dropna().unique()
-            iso_val = iso[0] if len(iso) > 0 else ""
-            fdf["country"] = country
-            fdf["iso_code"] = iso_val
-            fdf["metric"] = metric
-
-            out_rows.append(fdf)
-
-            # Save per-country interactive plot
-            try:
-                fig = country_forecast_plot(df, country, metric=metric, steps=steps)
-                fname = plots_dir / f"{_safe_filename(country)}_{metric}.html"
-                fig.write_html(str(fname), include_plotlyjs="cdn")
-            except Exception as e:
-                logging.warning(f"Failed to create plot for {country} ({metric}): {e}")
-
-        if not out_rows:
-            logging.warning(f"No forecasts were generated for metric '{metric}'")
-            continue
-
-        combined = pd.concat(out_rows, ignore_index=True)
-        out_csv = ROOT / "data" / f"forecasts_{metric}.csv"
-        combined.to_csv(out_csv, index=False)
-        logging.info(f"Wrote forecasts CSV to {out_csv}")
-        logging.info(f"Wrote per-country plots for metric '{metric}' to {plots_dir}")
+            combined = _stack_forecasts(out_rows, metric)
+            out_csv = ROOT / "data" / f"forecasts_{metric}.csv"
+            combined.to_csv(out_csv, index=False)
+            logging.info(f"Wrote forecasts CSV to {out_csv}")
+            logging.info(f"Wrote per-country plots for metric '{metric}' to {plots_dir}")
 
     # Additionally: create a global total CO2 forecast (aggregate across countries)
     try:
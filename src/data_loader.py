@@ -1,14 +1,91 @@
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 
+# Columns of the OWID dataset used by the dashboard pages and scripts
+OWID_COLUMNS = [
+    "country", "year", "iso_code", "population", "gdp",
+    "co2", "co2_per_capita",
+    "coal_co2", "oil_co2", "gas_co2", "cement_co2", "flaring_co2",
+    "cumulative_co2", "cumulative_co2_including_luc",
+    "cumulative_coal_co2", "cumulative_oil_co2", "cumulative_gas_co2",
+    "temperature_change_from_co2", "temperature_change_from_ch4",
+    "temperature_change_from_n2o", "temperature_change_from_ghg",
+    "share_of_temperature_change_from_ghg",
+]
+
+# Columns that keep double precision: GDP and population reach ~1e13 / ~1e9 and are
+# summed across countries and years, which float32's 7 significant digits cannot hold
+FLOAT64_COLUMNS = ("population", "gdp")
+
+# Explicit dtypes for the CSV parse so pandas skips per-column type inference.
+# Every column except the identifiers is numeric; emission and temperature columns are
+# read as float32, which halves the memory touched by the groupby/sum paths.
+OWID_DTYPES = {
+    "year": "int16",
+    **{
+        col: "float64" if col in FLOAT64_COLUMNS else "float32"
+        for col in OWID_COLUMNS if col not in ("country", "year", "iso_code")
+    },
+}
+
+
+def _read_owid(data_dir: str) -> pd.DataFrame:
+    """Read the OWID CO2 dataset, preferring the Parquet copy when it is up to date.
+
+    The Parquet file is produced by `scripts/csv_to_parquet.py`; it is ignored if the
+    CSV has been modified since it was written.
+    """
+    csv_path = Path(data_dir) / "owid-co2-data.csv"
+    parquet_path = Path(data_dir) / "owid-co2-data.parquet"
+    if parquet_path.exists() and (
+        not csv_path.exists() or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime
+    ):
+        return pd.read_parquet(parquet_path, columns=OWID_COLUMNS).astype(OWID_DTYPES)
+    return pd.read_csv(csv_path, usecols=OWID_COLUMNS, dtype=OWID_DTYPES, engine="pyarrow")
+
+
+# Bump whenever `_merge_owid` changes its output so stale on-disk caches are ignored
+MERGED_CACHE_VERSION = 3
+
+
 @st.cache_data
 def load_data(data_dir: str = "data") -> pd.DataFrame:
     """Load and merge the OWID CO2 dataset with continent mapping.
 
-    Returns a DataFrame with a normalized `continent_name` column.
+    Returns a DataFrame with a normalized `continent_name` column. Numeric OWID columns
+    are typed at read time (see `OWID_DTYPES`), so callers need not coerce them.
+
+    The merged frame is cached on disk as `owid-merged-v{MERGED_CACHE_VERSION}.parquet`
+    and reused while it is newer than every source file, so cold starts skip the CSV
+    parse and merge.
     """
-    df = pd.read_csv(f"{data_dir}/owid-co2-data.csv")
+    data_path = Path(data_dir)
+    cache_path = data_path / f"owid-merged-v{MERGED_CACHE_VERSION}.parquet"
+    sources = [
+        data_path / "owid-co2-data.csv",
+        data_path / "owid-co2-data.parquet",
+        data_path / "country-and-continent-codes-list-csv.csv",
+    ]
+    newest_source = max((p.stat().st_mtime for p in sources if p.exists()), default=0.0)
+    if cache_path.exists() and cache_path.stat().st_mtime >= newest_source:
+        return pd.read_parquet(cache_path)
+
+    merged = _merge_owid(data_dir)
+    try:
+        merged.to_parquet(cache_path, compression="zstd")
+    except OSError:
+        # Read-only data directory: keep serving the freshly merged frame
+        pass
+    return merged
+
+
+def _merge_owid(data_dir: str) -> pd.DataFrame:
+    """Read the source files and build the merged frame returned by `load_data`."""
+    df = _read_owid(data_dir)
     countries = pd.read_csv(f"{data_dir}/country-and-continent-codes-list-csv.csv")
 
     countries = countries.rename(columns={
@@ -30,9 +107,9 @@ def load_data(data_dir: str = "data") -> pd.DataFrame:
         "TUR": "Europe",   # Turkey -> Europe
     }
 
-    # Apply overrides where applicable
-    countries.loc[countries["three_letter_code"].isin(OVERRIDES.keys()), "continent_name"] = (
-        countries.loc[countries["three_letter_code"].isin(OVERRIDES.keys()), "three_letter_code"].map(OVERRIDES)
+    # Apply overrides where applicable (codes without an override keep their continent)
+    countries["continent_name"] = (
+        countries["three_letter_code"].map(OVERRIDES).fillna(countries["continent_name"])
     )
 
     # If the mapping file contains duplicate rows for the same three_letter_code,
@@ -40,18 +117,152 @@ def load_data(data_dir: str = "data") -> pd.DataFrame:
     # matches during the merge (which would duplicate country-year rows).
     countries = countries.drop_duplicates(subset=["three_letter_code"]) 
 
+    # Keep only country-level rows: drop entries without an ISO code
+    # Some aggregate rows have empty or missing iso_code; remove them
+    df["iso_code"] = df["iso_code"].replace("", pd.NA)
+    df = df.dropna(subset=["iso_code"]) 
+
+    # Filter to the requested range (2000-2022); `year` is already int16 (OWID_DTYPES)
+    df = df[df["year"].between(2000, 2022)]
+
+    # Rows are filtered before the merge so only the kept ~10% of the file is
+    # matched on the ISO key. The codes are unique after the de-duplication
+    # above, so the left merge keeps every row in order and the original
+    # row labels can be restored.
     merged = df.merge(countries[["three_letter_code", "continent_name"]],
                       left_on="iso_code", right_on="three_letter_code", how="left")
+    merged.index = df.index
 
     merged["continent_name"] = merged["continent_name"].fillna("Other")
 
-    # Keep only country-level rows: drop entries without an ISO code
-    # Some aggregate rows have empty or missing iso_code; remove them
-    merged["iso_code"] = merged["iso_code"].replace("", pd.NA)
-    merged = merged.dropna(subset=["iso_code"]) 
+    # Store the string keys as categoricals so groupby and equality masks work on
+    # integer codes; group with `observed=True` to skip unused categories
+    for col in ("country", "iso_code", "continent_name", "three_letter_code"):
+        merged[col] = merged[col].astype("category")
 
-    # Ensure `year` is numeric and filter to the requested range (2000-2022)
-    merged["year"] = pd.to_numeric(merged["year"], errors="coerce")
-    merged = merged[merged["year"].between(2000, 2022)]
+    # Order rows by year (stable, so countries stay alphabetical within a year) so that
+    # `year_slice` can locate a year with a binary search
+    merged = merged.sort_values("year", kind="stable")
 
     return merged
+
+
+def year_slice(df: pd.DataFrame, year: int) -> pd.DataFrame:
+    """Return the rows of `df` for a single `year`.
+
+    Frames returned by `load_data` (and row subsets of them) are sorted by year, so the
+    year's rows are found with a binary search and returned as a positional slice
+    instead of scanning a boolean mask over the whole frame. Unsorted frames fall back
+    to the mask.
+    """
+    years = df["year"]
+    if not years.is_monotonic_increasing:
+        return df[years == year]
+    lo = years.searchsorted(year, side="left")
+    hi = years.searchsorted(year, side="right")
+    return df.iloc[lo:hi]
+
+
+def year_mask(df: pd.DataFrame, years) -> np.ndarray:
+    """Return a boolean row mask selecting the `years` iterable in `df`.
+
+    Years span a small integer range, so membership is a lookup into a boolean table
+    indexed by `year - min_year` rather than hashing every row. Non-integer `year`
+    columns fall back to `isin`.
+    """
+    col = df["year"]
+    if not pd.api.types.is_integer_dtype(col) or len(col) == 0:
+        return col.isin(list(years)).to_numpy()
+    year_arr = col.to_numpy()
+    lo, hi = int(year_arr.min()), int(year_arr.max())
+    wanted = np.fromiter((int(y) for y in years), dtype=np.int64)
+    lut = np.zeros(hi - lo + 1, dtype=bool)
+    lut[wanted[(wanted >= lo) & (wanted <= hi)] - lo] = True
+    return lut[year_arr - lo]
+
+
+def years_slice(df: pd.DataFrame, years) -> pd.DataFrame:
+    """Return the rows of `df` whose year is in the `years` iterable.
+
+    A contiguous span of years (the usual multiselect range) on a year-sorted frame is
+    located with two binary searches and returned as a positional slice; other
+    selections, and unsorted frames, fall back to `year_mask`.
+    """
+    wanted = sorted({int(y) for y in years})
+    if not wanted:
+        return df.iloc[0:0]
+    col = df["year"]
+    if wanted[-1] - wanted[0] == len(wanted) - 1 and col.is_monotonic_increasing:
+        lo = col.searchsorted(wanted[0], side="left")
+        hi = col.searchsorted(wanted[-1], side="right")
+        return df.iloc[lo:hi]
+    return df[year_mask(df, wanted)]
+
+
+def country_mask(df: pd.DataFrame, countries) -> np.ndarray:
+    """Return a boolean row mask selecting `countries` in `df`.
+
+    With a categorical `country` column (as returned by `load_data`) the names are
+    resolved to category codes once and the rows are matched on the integer codes.
+    """
+    col = df["country"]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        codes = col.cat.categories.get_indexer(list(countries))
+        # -1 marks names that are not categories; it is also the code of missing values
+        return np.isin(col.cat.codes.to_numpy(), codes[codes >= 0])
+    return col.isin(countries).to_numpy()
+
+
+# Number of rows kept per (metric, year) in the precomputed rankings
+RANKING_DEPTH = 20
+
+
+def build_ranking_cache(df: pd.DataFrame, metrics, depth: int = RANKING_DEPTH) -> dict:
+    """Precompute the top `depth` countries per year for each of `metrics`.
+
+    Returns a dict mapping `(metric, year)` to a DataFrame with `country`, the metric and
+    `continent_name`, ordered from largest to smallest. Each metric is sorted once for
+    all years, so ranking queries become dict lookups.
+    """
+    cache = {}
+    for metric in metrics:
+        if metric not in df.columns:
+            continue
+        ranked = df.loc[df[metric].notna(), ["year", "country", metric, "continent_name"]]
+        ranked = ranked.sort_values(metric, ascending=False, kind="stable")
+        for year, top in ranked.groupby("year", sort=False).head(depth).groupby("year", sort=False):
+            cache[(metric, int(year))] = top[["country", metric, "continent_name"]]
+    return cache
+
+
+@st.cache_resource(show_spinner=False)
+def load_rankings(metrics: tuple, data_dir: str = "data") -> dict:
+    """Return `build_ranking_cache` for the `load_data(data_dir)` frame, built once per process.
+
+    The dict is shared across sessions (`st.cache_resource`); callers must not mutate the
+    frames it holds.
+    """
+    return build_ranking_cache(load_data(data_dir), metrics)
+
+
+@st.cache_data(show_spinner=False)
+def yearly_totals(metric: str, data_dir: str = "data") -> pd.DataFrame:
+    """Return `metric` summed across countries per year for the `load_data(data_dir)` frame.
+
+    The result has `year` and `metric` columns in year order. It is computed once per
+    metric rather than regrouping the full frame on every rerun.
+    """
+    return load_data(data_dir).groupby("year", as_index=False)[metric].sum()
+
+
+@st.cache_data(show_spinner=False)
+def continent_year_totals(data_dir: str = "data") -> pd.DataFrame:
+    """Return co2, gdp and population summed per (year, continent) for the `load_data(data_dir)` frame.
+
+    The result keeps `year` and `continent_name` as columns, so functions that filter
+    years and group by continent (e.g. `total_metric_by_continent`) accept it in place
+    of the row-level frame and only touch a few rows per year.
+    """
+    return load_data(data_dir).groupby(["year", "continent_name"], as_index=False, observed=True)[
+        ["co2", "gdp", "population"]
+    ].sum()
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -7,26 +8,19 @@ def add_gdp_category(df: pd.DataFrame) -> pd.DataFrame:
     Categories are determined per-year using tertiles (33% and 66%). Missing GDP -> 'Unknown'.
     """
     out = df.copy()
-    out["gdp"] = pd.to_numeric(out.get("gdp"), errors="coerce")
+    # load_data already types gdp as float; only coerce frames that arrive as text
+    if not pd.api.types.is_numeric_dtype(out.get("gdp")):
+        out["gdp"] = pd.to_numeric(out.get("gdp"), errors="coerce")
 
-    def assign(group: pd.DataFrame) -> pd.Series:
-        g = group["gdp"].dropna()
-        if g.empty:
-            return pd.Series(["Unknown"] * len(group), index=group.index)
-        q1 = g.quantile(0.33)
-        q2 = g.quantile(0.66)
-
-        def cat(v):
-            if pd.isna(v):
-                return "Unknown"
-            if v <= q1:
-                return "low"
-            if v <= q2:
-                return "mid"
-            return "high"
-
-        return group["gdp"].map(cat)
-
-    out["gdp_category"] = out.groupby("year", group_keys=False).apply(assign)
-    out["gdp_category"] = out["gdp_category"].fillna("Unknown")
+    # A value is <= the linear-interpolated q-quantile of its year exactly when its
+    # 0-based min-rank is <= floor((count - 1) * q), so one rank replaces the two
+    # quantile transforms
+    by_year = out.groupby("year")["gdp"]
+    pos = by_year.rank(method="min").to_numpy() - 1
+    last = by_year.transform("count").to_numpy() - 1
+    out["gdp_category"] = np.select(
+        [out["gdp"].isna().to_numpy(), pos <= np.floor(last * 0.33), pos <= np.floor(last * 0.66)],
+        ["Unknown", "low", "mid"],
+        default="high",
+    )
     return out
@@ -1,9 +1,31 @@
 """Analysis of CO2 emissions by fuel source (coal, oil, gas, cement, flaring)."""
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import Optional, List, Dict
 
+from src.data_loader import RANKING_DEPTH, year_slice
+
+
+FUEL_COLUMNS = ("coal_co2", "oil_co2", "gas_co2", "cement_co2", "flaring_co2")
+
+FUEL_COLORS = {
+    "coal_co2": "#8B4513",
+    "oil_co2": "#000000",
+    "gas_co2": "#4169E1",
+    "cement_co2": "#808080",
+    "flaring_co2": "#FFD700"
+}
+
+FUEL_LABELS = {
+    "coal_co2": "Coal",
+    "oil_co2": "Oil",
+    "gas_co2": "Gas",
+    "cement_co2": "Cement",
+    "flaring_co2": "Flaring"
+}
+
 
 def get_fuel_breakdown(df: pd.DataFrame, country: Optional[str] = None, year: Optional[int] = None) -> pd.DataFrame:
     """Get CO2 emissions breakdown by fuel source for a country/year or aggregated.
@@ -16,37 +38,35 @@ def get_fuel_breakdown(df: pd.DataFrame, country: Optional[str] = None, year: Op
     Returns:
         DataFrame with fuel source columns and totals
     """
-    data = df.copy()
-    
-    if country:
-        data = data[data["country"] == country]
-    if year:
-        data = data[data["year"] == year]
-    
-    fuel_cols = ["coal_co2", "oil_co2", "gas_co2", "cement_co2", "flaring_co2"]
-    available_cols = [col for col in fuel_cols if col in data.columns]
+    fuel_cols = list(FUEL_COLUMNS)
+    available_cols = [col for col in fuel_cols if col in df.columns]
     
     if not available_cols:
         return pd.DataFrame()
     
-    # Convert to numeric
-    for col in available_cols:
-        data[col] = pd.to_numeric(data[col], errors="coerce")
+    # Materialize only the rows and columns needed rather than copying the full frame
+    keep = ["country", "year"] + available_cols
+    data = year_slice(df, year) if year else df
+    if country:
+        data = data.loc[data["country"] == country, keep]
+    else:
+        data = data.loc[:, keep]
     
     # Aggregate if needed
     if country and year:
         result = data[available_cols + ["country", "year"]].iloc[0:1]
     elif country:
-        result = data.groupby(["country", "year"])[available_cols].sum().reset_index()
+        result = data.groupby(["country", "year"], observed=True)[available_cols].sum().reset_index()
     elif year:
-        result = data.groupby(["year", "country"])[available_cols].sum().reset_index()
+        result = data.groupby(["year", "country"], observed=True)[available_cols].sum().reset_index()
     else:
         result = data.groupby(["year"])[available_cols].sum().reset_index()
     
-    # Calculate total and percentages
-    result["total_fuel_co2"] = result[available_cols].sum(axis=1)
-    for col in available_cols:
-        result[f"{col}_pct"] = (result[col] / result["total_fuel_co2"] * 100).round(2)
+    # Calculate total and percentages (one broadcasted division for all fuel columns).
+    # The row total is a single NaN-skipping reduction over the contiguous fuel block.
+    result["total_fuel_co2"] = np.nansum(result[available_cols].to_numpy(), axis=1)
+    pct = (result[available_cols].div(result["total_fuel_co2"], axis=0) * 100).round(2).add_suffix("_pct")
+    result = pd.concat([result, pct], axis=1)
     
     return result
 
@@ -58,7 +78,7 @@ def plot_fuel_breakdown_timeseries(df: pd.DataFrame, country: Optional[str] = No
     if fuel_data.empty:
         return None
     
-    fuel_cols = ["coal_co2", "oil_co2", "gas_co2", "cement_co2", "flaring_co2"]
+    fuel_cols = list(FUEL_COLUMNS)
     available_cols = [col for col in fuel_cols if col in fuel_data.columns]
     
     if not available_cols:
@@ -70,31 +90,15 @@ def plot_fuel_breakdown_timeseries(df: pd.DataFrame, country: Optional[str] = No
     
     fig = go.Figure()
     
-    colors = {
-        "coal_co2": "#8B4513",
-        "oil_co2": "#000000",
-        "gas_co2": "#4169E1",
-        "cement_co2": "#808080",
-        "flaring_co2": "#FFD700"
-    }
-    
-    labels = {
-        "coal_co2": "Coal",
-        "oil_co2": "Oil",
-        "gas_co2": "Gas",
-        "cement_co2": "Cement",
-        "flaring_co2": "Flaring"
-    }
-    
     for col in available_cols:
         fig.add_trace(go.Scatter(
             x=fuel_data["year"],
             y=fuel_data[col],
             mode='lines',
-            name=labels.get(col, col),
+            name=FUEL_LABELS.get(col, col),
             stackgroup='one',
-            fillcolor=colors.get(col, "#CCCCCC"),
-            line=dict(width=0.5, color=colors.get(col, "#CCCCCC"))
+            fillcolor=FUEL_COLORS.get(col, "#CCCCCC"),
+            line=dict(width=0.5, color=FUEL_COLORS.get(col, "#CCCCCC"))
         ))
     
     title = f"CO2 Emissions by Fuel Source Over Time"
@@ -119,40 +123,21 @@ def plot_fuel_breakdown_pie(df: pd.DataFrame, country: str, year: int) -> Option
     if fuel_data.empty:
         return None
     
-    fuel_cols = ["coal_co2", "oil_co2", "gas_co2", "cement_co2", "flaring_co2"]
+    fuel_cols = list(FUEL_COLUMNS)
     available_cols = [col for col in fuel_cols if col in fuel_data.columns]
     
     if not available_cols:
         return None
     
-    values = []
-    labels = []
-    colors_list = []
-    
-    color_map = {
-        "coal_co2": "#8B4513",
-        "oil_co2": "#000000",
-        "gas_co2": "#4169E1",
-        "cement_co2": "#808080",
-        "flaring_co2": "#FFD700"
-    }
-    
-    label_map = {
-        "coal_co2": "Coal",
-        "oil_co2": "Oil",
-        "gas_co2": "Gas",
-        "cement_co2": "Cement",
-        "flaring_co2": "Flaring"
-    }
-    
-    for col in available_cols:
-        val = fuel_data[col].iloc[0]
-        if pd.notna(val) and val > 0:
-            values.append(val)
-            labels.append(label_map.get(col, col))
-            colors_list.append(color_map.get(col, "#CCCCCC"))
+    # Take the first row as one array and keep the positive, non-missing fuels
+    row = fuel_data[available_cols].iloc[0].to_numpy(dtype=float)
+    keep = np.isfinite(row) & (row > 0)
+    values = row[keep]
+    kept_cols = [col for col, k in zip(available_cols, keep) if k]
+    labels = [FUEL_LABELS.get(col, col) for col in kept_cols]
+    colors_list = [FUEL_COLORS.get(col, "#CCCCCC") for col in kept_cols]
     
-    if not values:
+    if not kept_cols:
         return None
     
     fig = go.Figure(data=[go.Pie(
@@ -169,17 +154,23 @@ def plot_fuel_breakdown_pie(df: pd.DataFrame, country: str, year: int) -> Option
     return fig
 
 
-def get_top_fuel_consumers(df: pd.DataFrame, year: int, fuel_type: str = "coal_co2", top_n: int = 10) -> pd.DataFrame:
-    """Get top N countries by a specific fuel type for a given year."""
-    df_year = df[df["year"] == year].copy()
-    
-    if fuel_type not in df_year.columns:
+def get_top_fuel_consumers(df: pd.DataFrame, year: int, fuel_type: str = "coal_co2", top_n: int = 10,
+                           rankings: Optional[Dict] = None) -> pd.DataFrame:
+    """Get top N countries by a specific fuel type for a given year.
+
+    If `rankings` (from `data_loader.load_rankings`) covers the request it is used instead
+    of ranking the year's rows of `df`.
+    """
+    if fuel_type not in df.columns:
         return pd.DataFrame()
     
-    df_year[fuel_type] = pd.to_numeric(df_year[fuel_type], errors="coerce")
+    if rankings is not None and top_n <= RANKING_DEPTH and (fuel_type, int(year)) in rankings:
+        return rankings[(fuel_type, int(year))].head(top_n).sort_values(fuel_type, ascending=True)
+    
+    df_year = year_slice(df, year)[["country", fuel_type, "continent_name"]]
     df_year = df_year.dropna(subset=[fuel_type])
     
-    top = df_year.nlargest(top_n, fuel_type)[["country", fuel_type, "continent_name"]]
+    top = df_year.nlargest(top_n, fuel_type)
     
     return top.sort_values(fuel_type, ascending=True)
 
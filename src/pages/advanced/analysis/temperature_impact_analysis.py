@@ -1,37 +1,31 @@
 """Analysis of temperature impact from greenhouse gas emissions."""
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import Optional, List, Dict
 
+from src.data_loader import country_mask, year_slice
+
 
 def get_temperature_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Get temperature impact data from emissions."""
-    data = df.copy()
-    
-    temp_cols = [
-        "temperature_change_from_co2",
-        "temperature_change_from_ch4",
-        "temperature_change_from_n2o",
-        "temperature_change_from_ghg",
-        "share_of_temperature_change_from_ghg"
-    ]
-    
-    for col in temp_cols:
-        if col in data.columns:
-            data[col] = pd.to_numeric(data[col], errors="coerce")
-    
-    return data
+    """Get temperature impact data from emissions.
+
+    The temperature columns are already float (typed by `load_data`), so the frame is
+    returned as is, without a copy; callers filter it before assigning columns.
+    """
+    return df
 
 
 def plot_temperature_contribution_map(df: pd.DataFrame, year: int) -> Optional[go.Figure]:
     """Plot choropleth map showing countries' contribution to global temperature change."""
     data = get_temperature_data(df)
-    data_year = data[data["year"] == year].copy()
     
-    if "temperature_change_from_ghg" not in data_year.columns or "iso_code" not in data_year.columns:
+    if "temperature_change_from_ghg" not in data.columns or "iso_code" not in data.columns:
         return None
     
+    data_year = year_slice(data, year)
+    
     data_year = data_year.dropna(subset=["iso_code", "temperature_change_from_ghg"])
     
     if data_year.empty:
@@ -56,7 +50,7 @@ def plot_temperature_contribution_map(df: pd.DataFrame, year: int) -> Optional[g
 def plot_temperature_breakdown(df: pd.DataFrame, country: str) -> Optional[go.Figure]:
     """Plot breakdown of temperature contribution by gas type (CO2, methane, N2O)."""
     data = get_temperature_data(df)
-    country_data = data[data["country"] == country].sort_values("year")
+    country_data = data[data["country"] == country]  # already in year order from load_data
     
     if country_data.empty:
         return None
@@ -72,10 +66,13 @@ def plot_temperature_breakdown(df: pd.DataFrame, country: str) -> Optional[go.Fi
     if not available_cols:
         return None
     
-    country_data = country_data.dropna(subset=["year"] + available_cols, how="all")
-    
-    if country_data.empty:
+    # Rows where year and every gas column are missing carry nothing to plot; test the
+    # mask before slicing so all-present data is not copied
+    keep = country_data[["year"] + available_cols].notna().any(axis=1).to_numpy()
+    if not keep.any():
         return None
+    if not keep.all():
+        country_data = country_data[keep]
     
     fig = go.Figure()
     
@@ -115,16 +112,15 @@ def plot_temperature_breakdown(df: pd.DataFrame, country: str) -> Optional[go.Fi
 def get_top_temperature_contributors(df: pd.DataFrame, year: int, top_n: int = 15) -> pd.DataFrame:
     """Get top contributors to global temperature change."""
     data = get_temperature_data(df)
-    data_year = data[data["year"] == year].copy()
     
-    if "temperature_change_from_ghg" not in data_year.columns:
+    if "temperature_change_from_ghg" not in data.columns:
         return pd.DataFrame()
     
-    data_year = data_year.dropna(subset=["temperature_change_from_ghg"])
-    
-    top = data_year.nlargest(top_n, "temperature_change_from_ghg")[
+    data_year = year_slice(data, year)[
         ["country", "temperature_change_from_ghg", "share_of_temperature_change_from_ghg", "continent_name"]
-    ].sort_values("temperature_change_from_ghg", ascending=False)
+    ].dropna(subset=["temperature_change_from_ghg"])
+    
+    top = data_year.nlargest(top_n, "temperature_change_from_ghg")
     
     return top
 
@@ -132,11 +128,12 @@ def get_top_temperature_contributors(df: pd.DataFrame, year: int, top_n: int = 1
 def plot_temperature_vs_emissions(df: pd.DataFrame, year: int) -> Optional[go.Figure]:
     """Scatter plot showing relationship between emissions and temperature impact."""
     data = get_temperature_data(df)
-    data_year = data[data["year"] == year].copy()
     
-    if "temperature_change_from_ghg" not in data_year.columns or "co2" not in data_year.columns:
+    if "temperature_change_from_ghg" not in data.columns or "co2" not in data.columns:
         return None
     
+    data_year = year_slice(data, year)
+    
     data_year = data_year.dropna(subset=["temperature_change_from_ghg", "co2"])
     
     if data_year.empty:
@@ -146,7 +143,7 @@ def plot_temperature_vs_emissions(df: pd.DataFrame, year: int) -> Optional[go.Fi
 
     # Ensure size column is numeric and contains no NaN values (Plotly errors on NaN sizes)
     if size_col is not None:
-        data_year[size_col] = pd.to_numeric(data_year[size_col], errors="coerce").fillna(0)
+        data_year[size_col] = data_year[size_col].fillna(0)
 
     fig = px.scatter(
         data_year,
@@ -169,29 +166,28 @@ def plot_temperature_vs_emissions(df: pd.DataFrame, year: int) -> Optional[go.Fi
 def plot_cumulative_temperature_impact(df: pd.DataFrame, countries: List[str]) -> Optional[go.Figure]:
     """Plot cumulative temperature impact over time for selected countries."""
     data = get_temperature_data(df)
-    data_filtered = data[data["country"].isin(countries)].copy()
     
-    if "temperature_change_from_ghg" not in data_filtered.columns:
+    if "temperature_change_from_ghg" not in data.columns:
         return None
     
-    data_filtered = data_filtered.dropna(subset=["temperature_change_from_ghg", "year"])
+    # Only the plotted columns are taken, so the added cumulative column never needs a
+    # copy of the full-width frame
+    data_filtered = data.loc[
+        country_mask(data, countries), ["country", "year", "temperature_change_from_ghg"]
+    ].dropna(subset=["temperature_change_from_ghg", "year"])
     
     if data_filtered.empty:
         return None
     
-    # Calculate cumulative impact (sum of temperature changes)
-    cumulative_data = []
-    for country in countries:
-        country_data = data_filtered[data_filtered["country"] == country].sort_values("year")
-        if not country_data.empty:
-            country_data = country_data.copy()
-            country_data["cumulative_temp"] = country_data["temperature_change_from_ghg"].cumsum()
-            cumulative_data.append(country_data)
-    
-    if not cumulative_data:
-        return None
-    
-    combined = pd.concat(cumulative_data, ignore_index=True)
+    # Calculate cumulative impact (sum of temperature changes) with one grouped cumsum,
+    # ordering rows by the position of each country in `countries`, then by year
+    position = pd.Index(countries).get_indexer(data_filtered["country"])
+    combined = data_filtered.iloc[np.lexsort((data_filtered["year"].to_numpy(), position))]
+    combined = combined.assign(
+        cumulative_temp=combined.groupby("country", sort=False, observed=True)[
+            "temperature_change_from_ghg"
+        ].cumsum()
+    )
     
     fig = px.line(
         combined,
@@ -1,17 +1,203 @@
 """Streamlit page for advanced CO2 emissions analysis."""
 import streamlit as st
 import pandas as pd
+from typing import Optional
+
+from src.data_loader import load_data, load_rankings
 from src.pages.advanced.analysis import (
     fuel_source_analysis,
     temperature_impact_analysis,
 )
 
 
-def render_advanced_analysis_page(df: pd.DataFrame):
-    """Render the Advanced Analysis page into the current Streamlit app context."""
+@st.cache_data(show_spinner=False)
+def _selection_options(data_dir: str = "data"):
+    """Return the (countries, years) option lists shared by the page's selectors."""
+    df = load_data(data_dir)
+    countries = sorted(df["country"].dropna().unique())
+    years = sorted(df["year"].unique().tolist())
+    return countries, years
+
+
+# Figure and table caches are keyed on the selection and `data_dir` only (the frame comes
+# from the cached `load_data`), so unchanged selections skip both hashing the frame and rebuilding
+@st.cache_data(max_entries=64, show_spinner=False)
+def _fuel_timeseries_figure(country: Optional[str], data_dir: str = "data"):
+    return fuel_source_analysis.plot_fuel_breakdown_timeseries(load_data(data_dir), country=country)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _fuel_pie_figure(country: str, year: int, data_dir: str = "data"):
+    return fuel_source_analysis.plot_fuel_breakdown_pie(load_data(data_dir), country, year)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _temperature_map_figure(year: int, data_dir: str = "data"):
+    return temperature_impact_analysis.plot_temperature_contribution_map(load_data(data_dir), year)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _temperature_vs_emissions_figure(year: int, data_dir: str = "data"):
+    return temperature_impact_analysis.plot_temperature_vs_emissions(load_data(data_dir), year)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _temperature_breakdown_figure(country: str, data_dir: str = "data"):
+    return temperature_impact_analysis.plot_temperature_breakdown(load_data(data_dir), country)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cumulative_temperature_figure(countries: tuple, data_dir: str = "data"):
+    return temperature_impact_analysis.plot_cumulative_temperature_impact(load_data(data_dir), list(countries))
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _top_fuel_table(year: int, fuel_type: str, data_dir: str = "data") -> pd.DataFrame:
+    return fuel_source_analysis.get_top_fuel_consumers(
+        load_data(data_dir), year, fuel_type, top_n=10,
+        rankings=load_rankings(fuel_source_analysis.FUEL_COLUMNS, data_dir),
+    )
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _top_temperature_table(year: int, data_dir: str = "data") -> pd.DataFrame:
+    return temperature_impact_analysis.get_top_temperature_contributors(load_data(data_dir), year, top_n=15)
+
+
+# Each tab is a fragment: its widgets rerun only that tab, so changing the temperature
+# year does not rebuild the fuel figures and vice versa
+@st.fragment
+def _render_fuel_tab(data_dir: str, country_list: list, years: list):
+    st.subheader("CO2 Emissions by Fuel Source")
+    st.markdown("Analyze emissions breakdown by fuel type: coal, oil, gas, cement, and flaring.")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        selected_country = st.selectbox("Select Country", options=["All Countries"] + country_list, key="fuel_country")
+    
+    with col2:
+        selected_year = st.selectbox("Select Year", options=years, index=len(years)-1, key="fuel_year")
+    
+    if selected_country == "All Countries":
+        # Show global fuel breakdown over time
+        fig = _fuel_timeseries_figure(None, data_dir)
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning("No fuel source data available.")
+    else:
+        # Show country-specific analysis
+        col3, col4 = st.columns(2)
+        
+        with col3:
+            st.markdown("**Time Series**")
+            fig1 = _fuel_timeseries_figure(selected_country, data_dir)
+            if fig1:
+                st.plotly_chart(fig1, use_container_width=True)
+            else:
+                st.warning("No fuel source data available for this country.")
+        
+        with col4:
+            st.markdown("**Breakdown by Year**")
+            fig2 = _fuel_pie_figure(selected_country, int(selected_year), data_dir)
+            if fig2:
+                st.plotly_chart(fig2, use_container_width=True)
+            else:
+                st.warning("No fuel source data available for this country/year.")
+    
+    # Top fuel consumers
+    st.markdown("---")
+    st.subheader("Top Fuel Consumers")
+    fuel_type = st.selectbox(
+        "Fuel Type",
+        options=["coal_co2", "oil_co2", "gas_co2", "cement_co2", "flaring_co2"],
+        format_func=lambda x: x.replace("_co2", "").title(),
+        key="top_fuel_type"
+    )
+    
+    top_fuel = _top_fuel_table(int(selected_year), fuel_type, data_dir)
+    if not top_fuel.empty:
+        st.dataframe(top_fuel, use_container_width=True)
+    else:
+        st.warning("No data available for this fuel type.")
+
+
+@st.fragment
+def _render_temperature_tab(data_dir: str, country_list: list, years: list):
+    st.subheader("Temperature Impact from Emissions")
+    st.markdown("**Unique Analysis**: See how countries' emissions contribute to global temperature change. This shows the direct climate impact of emissions.")
+    
+    temp_year = st.selectbox("Select Year", options=years, index=len(years)-1, key="temp_year")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Global Temperature Contribution Map**")
+        fig_temp_map = _temperature_map_figure(int(temp_year), data_dir)
+        if fig_temp_map:
+            st.plotly_chart(fig_temp_map, use_container_width=True)
+        else:
+            st.warning("No temperature impact data available. This data may not be available for all years.")
+    
+    with col2:
+        st.markdown("**Top Temperature Contributors**")
+        top_temp = _top_temperature_table(int(temp_year), data_dir)
+        if not top_temp.empty:
+            st.dataframe(top_temp, use_container_width=True)
+        else:
+            st.warning("No temperature contribution data available.")
+    
+    st.markdown("---")
+    st.subheader("Temperature Impact Analysis")
+    
+    col3, col4 = st.columns(2)
+    
+    with col3:
+        st.markdown("**Emissions vs Temperature Impact**")
+        fig_temp_vs_co2 = _temperature_vs_emissions_figure(int(temp_year), data_dir)
+        if fig_temp_vs_co2:
+            st.plotly_chart(fig_temp_vs_co2, use_container_width=True)
+        else:
+            st.warning("No temperature vs emissions data available.")
+    
+    with col4:
+        st.markdown("**Temperature Breakdown by Gas**")
+        temp_country = st.selectbox("Select Country", options=country_list, key="temp_country")
+        
+        fig_temp_breakdown = _temperature_breakdown_figure(temp_country, data_dir)
+        if fig_temp_breakdown:
+            st.plotly_chart(fig_temp_breakdown, use_container_width=True)
+        else:
+            st.warning("No temperature breakdown data available for this country.")
+    
+    st.markdown("---")
+    st.subheader("Cumulative Temperature Impact")
+    selected_countries = st.multiselect(
+        "Select Countries to Compare",
+        options=country_list,
+        default=country_list[:5] if len(country_list) >= 5 else country_list,
+        key="temp_countries"
+    )
+    
+    if selected_countries:
+        fig_cum_temp = _cumulative_temperature_figure(tuple(selected_countries), data_dir)
+        if fig_cum_temp:
+            st.plotly_chart(fig_cum_temp, use_container_width=True)
+        else:
+            st.warning("No cumulative temperature data available.")
+
+
+def render_advanced_analysis_page(data_dir: str):
+    """Render the Advanced Analysis page into the current Streamlit app context.
+
+    Every chart and table is built from `load_data(data_dir)`.
+    """
     st.header("Advanced CO2 Emissions Analysis")
     st.markdown("Explore deeper insights into CO2 emissions: fuel sources, greenhouse gases, and temperature impact.")
     
+    country_list, years = _selection_options(data_dir)
+    
     # Create tabs for different analysis types
     tab1, tab2 = st.tabs([
         "Fuel Sources",
@@ -20,61 +206,7 @@ def render_advanced_analysis_page(df: pd.DataFrame):
     
     # Tab 1: Fuel Sources
     with tab1:
-        st.subheader("CO2 Emissions by Fuel Source")
-        st.markdown("Analyze emissions breakdown by fuel type: coal, oil, gas, cement, and flaring.")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            country_list = sorted(df["country"].dropna().unique())
-            selected_country = st.selectbox("Select Country", options=["All Countries"] + country_list, key="fuel_country")
-        
-        with col2:
-            years = sorted(df["year"].dropna().astype(int).unique())
-            selected_year = st.selectbox("Select Year", options=years, index=len(years)-1, key="fuel_year")
-        
-        if selected_country == "All Countries":
-            # Show global fuel breakdown over time
-            fig = fuel_source_analysis.plot_fuel_breakdown_timeseries(df, country=None)
-            if fig:
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.warning("No fuel source data available.")
-        else:
-            # Show country-specific analysis
-            col3, col4 = st.columns(2)
-            
-            with col3:
-                st.markdown("**Time Series**")
-                fig1 = fuel_source_analysis.plot_fuel_breakdown_timeseries(df, country=selected_country)
-                if fig1:
-                    st.plotly_chart(fig1, use_container_width=True)
-                else:
-                    st.warning("No fuel source data available for this country.")
-            
-            with col4:
-                st.markdown("**Breakdown by Year**")
-                fig2 = fuel_source_analysis.plot_fuel_breakdown_pie(df, selected_country, selected_year)
-                if fig2:
-                    st.plotly_chart(fig2, use_container_width=True)
-                else:
-                    st.warning("No fuel source data available for this country/year.")
-        
-        # Top fuel consumers
-        st.markdown("---")
-        st.subheader("Top Fuel Consumers")
-        fuel_type = st.selectbox(
-            "Fuel Type",
-            options=["coal_co2", "oil_co2", "gas_co2", "cement_co2", "flaring_co2"],
-            format_func=lambda x: x.replace("_co2", "").title(),
-            key="top_fuel_type"
-        )
-        
-        top_fuel = fuel_source_analysis.get_top_fuel_consumers(df, selected_year, fuel_type, top_n=10)
-        if not top_fuel.empty:
-            st.dataframe(top_fuel, use_container_width=True)
-        else:
-            st.warning("No data available for this fuel type.")
+        _render_fuel_tab(data_dir, country_list, years)
     
     # (Consumption, Efficiency, and Cumulative analyses removed per user request.)
     
@@ -82,68 +214,4 @@ def render_advanced_analysis_page(df: pd.DataFrame):
     
     # Tab 2: Temperature Impact
     with tab2:
-        st.subheader("Temperature Impact from Emissions")
-        st.markdown("**Unique Analysis**: See how countries' emissions contribute to global temperature change. This shows the direct climate impact of emissions.")
-        
-        years = sorted(df["year"].dropna().astype(int).unique())
-        temp_year = st.selectbox("Select Year", options=years, index=len(years)-1, key="temp_year")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("**Global Temperature Contribution Map**")
-            fig_temp_map = temperature_impact_analysis.plot_temperature_contribution_map(df, temp_year)
-            if fig_temp_map:
-                st.plotly_chart(fig_temp_map, use_container_width=True)
-            else:
-                st.warning("No temperature impact data available. This data may not be available for all years.")
-        
-        with col2:
-            st.markdown("**Top Temperature Contributors**")
-            top_temp = temperature_impact_analysis.get_top_temperature_contributors(df, temp_year, top_n=15)
-            if not top_temp.empty:
-                st.dataframe(top_temp, use_container_width=True)
-            else:
-                st.warning("No temperature contribution data available.")
-        
-        st.markdown("---")
-        st.subheader("Temperature Impact Analysis")
-        
-        col3, col4 = st.columns(2)
-        
-        with col3:
-            st.markdown("**Emissions vs Temperature Impact**")
-            fig_temp_vs_co2 = temperature_impact_analysis.plot_temperature_vs_emissions(df, temp_year)
-            if fig_temp_vs_co2:
-                st.plotly_chart(fig_temp_vs_co2, use_container_width=True)
-            else:
-                st.warning("No temperature vs emissions data available.")
-        
-        with col4:
-            st.markdown("**Temperature Breakdown by Gas**")
-            country_list = sorted(df["country"].dropna().unique())
-            temp_country = st.selectbox("Select Country", options=country_list, key="temp_country")
-            
-            fig_temp_breakdown = temperature_impact_analysis.plot_temperature_breakdown(df, temp_country)
-            if fig_temp_breakdown:
-                st.plotly_chart(fig_temp_breakdown, use_container_width=True)
-            else:
-                st.warning("No temperature breakdown data available for this country.")
-        
-        st.markdown("---")
-        st.subheader("Cumulative Temperature Impact")
-        country_list = sorted(df["country"].dropna().unique())
-        selected_countries = st.multiselect(
-            "Select Countries to Compare",
-            options=country_list,
-            default=country_list[:5] if len(country_list) >= 5 else country_list,
-            key="temp_countries"
-        )
-        
-        if selected_countries:
-            fig_cum_temp = temperature_impact_analysis.plot_cumulative_temperature_impact(df, selected_countries)
-            if fig_cum_temp:
-                st.plotly_chart(fig_cum_temp, use_container_width=True)
-            else:
-                st.warning("No cumulative temperature data available.")
-
+        _render_temperature_tab(data_dir, country_list, years)
@@ -1,10 +1,12 @@
 import streamlit as st
+from src.data_loader import continent_year_totals, load_data, years_slice
 from src.gdp_category import add_gdp_category
-from src.pages.overview.viz_map import choropleth_co2
-from src.pages.overview.viz_continent_bar import total_co2_by_continent
+from src.pages.overview.viz_map import choropleth_co2_many
+from src.pages.overview.viz_continent_bar import total_metric_by_continent
 from src.pages.overview.viz_sunburst import sunburst_co2, sunburst_co2_percapita
-from src.pages.overview.viz_top10 import top10_countries_by_metric, top10_co2_with_gdp, top10_by_co2_metric
+from src.pages.overview.viz_top10 import country_totals, top10_countries_by_metric, top10_co2_with_gdp, top10_by_co2_metric
 import pandas as pd
+from functools import lru_cache
 from typing import Optional, Iterable, Union, List
 
 
@@ -22,7 +24,12 @@ def _normalize_years(years: Union[int, Iterable[int], None]) -> Optional[List[in
 def _years_title(years_list: Optional[List[int]]) -> str:
     if not years_list:
         return "all"
-    years_sorted = sorted(years_list)
+    return _years_title_cached(frozenset(years_list))
+
+
+@lru_cache(maxsize=64)
+def _years_title_cached(years: frozenset) -> str:
+    years_sorted = sorted(years)
     if len(years_sorted) == 1:
         return str(years_sorted[0])
     if years_sorted[-1] - years_sorted[0] == len(years_sorted) - 1:
@@ -39,271 +46,126 @@ def _cagr(start: float, end: float, periods: int) -> Optional[float]:
         return None
 
 
-def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], selected_continents: list):
-    """Render the Overview page into the current Streamlit app context.
+@st.cache_resource(show_spinner=False)
+def _categorized_frame(data_dir: str = "data") -> pd.DataFrame:
+    """Return `add_gdp_category` applied to the `load_data(data_dir)` frame, built once per process.
 
-    Inputs:
-      - df: loaded DataFrame (raw from loader)
-      - years: int, iterable of ints, or None (all years)
-      - selected_continents: list of continent names to include
+    The frame is shared across sessions (`st.cache_resource`); callers must not mutate it.
     """
-    # Ensure GDP categories are present (tertile per year)
-    df_with_cat = add_gdp_category(df)
+    return add_gdp_category(load_data(data_dir))
 
-    years_list = _normalize_years(years)
 
-    # Build a working selection filtered by years and continents for table / simple aggregations
-    if years_list is None:
-        df_sel = df_with_cat.copy()
-    else:
-        df_sel = df_with_cat[df_with_cat["year"].isin(years_list)].copy()
+@st.cache_data(max_entries=64, show_spinner=False)
+def _overview_selection(years: Optional[tuple], continents: Optional[tuple], data_dir: str = "data") -> pd.DataFrame:
+    """Return the categorized rows for `years` (None = all) and `continents` (None = all).
 
-    if selected_continents:
-        df_sel = df_sel[df_sel["continent_name"].isin(selected_continents)].copy()
+    Pass sorted tuples so equal selections share one entry; chart-option widgets then
+    rerun against the cached selection instead of refiltering the frame.
+    """
+    out = _categorized_frame(data_dir)
+    if years is not None:
+        out = years_slice(out, years)
+    if continents:
+        out = out[out["continent_name"].isin(continents)]
+    return out
 
-    # (GDP category filter removed per user request)
 
-    # Global summary: total global CO2 and CO2 per capita (sum across selected years)
-    st.subheader("Global summary")
-    if df_sel.empty:
-        st.write("No data for selected filters")
-    else:
-        # ensure numeric
-        for col in ("co2", "population"):
-            if col in df_sel.columns:
-                df_sel[col] = pd.to_numeric(df_sel[col], errors="coerce")
+@st.cache_data(max_entries=64, show_spinner=False)
+def _overview_table(years: Optional[tuple], continents: Optional[tuple], data_dir: str = "data"):
+    """Return the per-country totals table for the selection and its CSV text.
 
-        total_co2 = df_sel["co2"].sum(min_count=1)
-        total_pop = df_sel["population"].sum(min_count=1)
+    Both are built once per selection, so reruns from the chart widgets neither regroup
+    the rows nor serialize the download payload again.
+    """
+    table = _overview_selection(years, continents, data_dir).groupby(
+        ["country", "iso_code", "continent_name", "gdp_category"], as_index=False, observed=True
+    )[["co2", "population", "gdp"]].sum()
+    return table, table.to_csv(index=False)
 
-        # Compute per-capita correctly: `co2` is in million tonnes (Mt).
-        # Convert to kilograms per person: (Mt * 1e9 kg/Mt) / population
-        co2_per_capita_kg = None
-        if pd.notna(total_co2) and pd.notna(total_pop) and total_pop > 0:
-            co2_per_capita_kg = (total_co2 * 1e9) / total_pop
 
-        c1, c2 = st.columns(2)
-        with c1:
-            if pd.notna(total_co2):
-                # `co2` is in million tonnes according to the codebook
-                st.metric("Total CO2 (Mt)", f"{total_co2:,.1f} Mt")
-            else:
-                st.metric("Total CO2 (Mt)", "n/a")
+# Figure caches are keyed on the same sorted tuples, so reruns triggered by unrelated
+# widgets (chart options, the Top 10 metric) reuse the maps and sunbursts as built
+@st.cache_data(max_entries=64, show_spinner=False)
+def _map_figures(years: Optional[tuple], continents: Optional[tuple], data_dir: str = "data"):
+    # both maps share one year/ISO-code selection
+    return choropleth_co2_many(_overview_selection(None, continents, data_dir), years, color_cols=("co2", "co2_per_capita"))
 
-        with c2:
-            if co2_per_capita_kg is not None:
-                st.metric("Global CO2 per capita (kg/person)", f"{co2_per_capita_kg:,.1f} kg/person")
-            else:
-                st.metric("Global CO2 per capita (kg/person)", "n/a")
 
-    # Centered world choropleths (Total CO2 and CO2 per capita stacked), with continent bar below
-    # Centered choropleths stacked vertically
-    left, mid, right = st.columns([1, 3, 1])
-    with mid:
-        st.subheader("World choropleth — Total CO2")
-        # Prepare df for maps (apply continent + gdp filters)
-        df_map = df_with_cat.copy()
-        if selected_continents:
-            df_map = df_map[df_map["continent_name"].isin(selected_continents)].copy()
+@st.cache_data(max_entries=64, show_spinner=False)
+def _continent_figure(years: Optional[tuple], continents: Optional[tuple], metric: str, data_dir: str = "data"):
+    # the bars only need per-(year, continent) sums, so they read the cached totals
+    totals = continent_year_totals(data_dir)
+    if continents:
+        totals = totals[totals["continent_name"].isin(continents)]
+    return total_metric_by_continent(totals, years, metric=metric)
 
-        fig_map_total = choropleth_co2(df_map, years_list, color_col="co2")
-        if fig_map_total is None:
-            st.write("No map data for selected years")
-        else:
-            st.plotly_chart(fig_map_total, use_container_width=True)
 
-        st.subheader("World choropleth — CO2 per capita")
-        fig_map_pc = choropleth_co2(df_map, years_list, color_col="co2_per_capita")
-        if fig_map_pc is None:
-            st.write("No map data for selected years")
-        else:
-            st.plotly_chart(fig_map_pc, use_container_width=True)
-
-    # Continent bar appears full-width below the centered maps
-    st.subheader("By Continent")
-    df_bar = df_with_cat.copy()
-    if selected_continents:
-        df_bar = df_bar[df_bar["continent_name"].isin(selected_continents)].copy()
-
-    col_a, col_b = st.columns(2)
-    with col_a:
-        st.caption("Total CO2 by Continent")
-        fig_co2 = total_co2_by_continent(df_bar, years_list)
-        if fig_co2 is None:
-            st.write("No continent CO2 data for selected years")
-        else:
-            st.plotly_chart(fig_co2, use_container_width=True)
-
-    with col_b:
-        st.caption("Total GDP by Continent")
-        # use the generic continent function to plot GDP
-        try:
-            from src.pages.overview.viz_continent_bar import total_metric_by_continent
-        except Exception:
-            total_metric_by_continent = None
+@st.cache_data(max_entries=64, show_spinner=False)
+def _sunburst_figure(years: Optional[tuple], continents: Optional[tuple], data_dir: str = "data"):
+    return sunburst_co2(_overview_selection(None, continents, data_dir), years=years)
 
-        if total_metric_by_continent is None:
-            st.write("GDP chart unavailable")
-        else:
-            fig_gdp = total_metric_by_continent(df_bar, years_list, metric="gdp")
-            if fig_gdp is None:
-                st.write("No continent GDP data for selected years")
-            else:
-                st.plotly_chart(fig_gdp, use_container_width=True)
 
-    st.markdown("---")
+@st.cache_data(max_entries=64, show_spinner=False)
+def _sunburst_percapita_figure(years: Optional[tuple], continents: Optional[tuple], data_dir: str = "data"):
+    return sunburst_co2_percapita(_overview_selection(None, continents, data_dir), years=years)
 
-    st.markdown("---")
-    st.subheader("Sunbursts")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.caption("Total CO2 (continent → GDP category → country)")
-        fig_sun = sunburst_co2(df_with_cat, years=years_list, continents=selected_continents)
-        if fig_sun is None:
-            st.write("No data for sunburst chart")
-        else:
-            st.plotly_chart(fig_sun, use_container_width=True)
 
-    with col2:
-        st.caption("CO2 per capita (continent → GDP category → country)")
-        fig_co2pc = sunburst_co2_percapita(df_with_cat, years=years_list, continents=selected_continents)
-        if fig_co2pc is None:
-            st.write("No data for CO2 per-capita sunburst")
-        else:
-            st.plotly_chart(fig_co2pc, use_container_width=True)
+@st.cache_data(max_entries=64, show_spinner=False)
+def _top10_aggregate(years: Optional[tuple], continents: Optional[tuple], data_dir: str = "data") -> pd.DataFrame:
+    # not keyed on the Top 10 metric, so switching it reuses the aggregate and only re-ranks
+    return country_totals(load_data(data_dir), years, list(continents) if continents else None)
 
-    st.markdown("---")
 
-    st.subheader("Top 10 countries")
-    # We rank Top 10 by highest CO2, and for metrics co2_per_capita and population
-    # also overlay GDP as a secondary y-axis. The 'gdp' option is removed.
-    metric = st.selectbox("Top metric", options=["co2", "co2_per_capita", "population"], index=0)
+@st.cache_data(max_entries=64, show_spinner=False)
+def _top10_figure(years: Optional[tuple], continents: Optional[tuple], metric: str, data_dir: str = "data"):
+    # Countries are ranked by `metric`; for co2_per_capita and population GDP is overlaid
+    # on a secondary y-axis
+    agg = _top10_aggregate(years, continents, data_dir)
     if metric == "co2":
-        fig_top10 = top10_co2_with_gdp(df_with_cat, years_list, continent_filter=selected_continents)
-    elif metric in ("co2_per_capita", "population"):
-        fig_top10 = top10_by_co2_metric(df_with_cat, years_list, metric=metric, continent_filter=selected_continents, add_gdp_line=True)
-    else:
-        fig_top10 = top10_countries_by_metric(df_with_cat, years_list, metric=metric, continent_filter=selected_continents)
-    if fig_top10 is None:
-        st.write("No data for Top 10 chart")
-    else:
-        st.plotly_chart(fig_top10, use_container_width=True)
+        return top10_co2_with_gdp(agg, years)
+    if metric in ("co2_per_capita", "population"):
+        return top10_by_co2_metric(agg, years, metric=metric, add_gdp_line=True)
+    return top10_countries_by_metric(agg, years, metric=metric)
 
-    st.markdown("---")
-    st.subheader("GDP vs CO2 correlation")
-    try:
-        from src.pages.overview.viz_correlation import correlation_gdp_co2
-    except Exception:
-        correlation_gdp_co2 = None
 
-    if correlation_gdp_co2 is None:
-        st.write("Correlation chart not available")
-    else:
-        # Options: log axes and show trend
-        cols = st.columns([1,1,2])
-        with cols[0]:
-            log_x = st.checkbox("Log GDP (x)", value=True)
-        with cols[1]:
-            log_y = st.checkbox("Log CO2 (y)", value=True)
-        with cols[2]:
-            show_trend = st.checkbox("Show trend line", value=True)
+@st.cache_data(max_entries=64, show_spinner=False)
+def _correlation_aggregate(years: Optional[tuple], continents: Optional[tuple], data_dir: str = "data") -> pd.DataFrame:
+    # toggling the chart options reuses the aggregate instead of refiltering the frame
+    from src.pages.overview.viz_correlation import correlation_aggregate
+    return correlation_aggregate(load_data(data_dir), years=years, continents=continents)
 
-        fig_corr = correlation_gdp_co2(df_with_cat, years=years_list, continents=selected_continents, log_x=log_x, log_y=log_y, show_trend=show_trend)
-        if fig_corr is None:
-            st.write("No data for correlation chart with selected filters")
-        else:
-            st.plotly_chart(fig_corr, use_container_width=True)
 
-    st.markdown("---")
-    st.subheader("Filtered data")
-    # For the data table, show totals per country for the selected years and continents
-    table_df = df_sel
-
-    agg_table = table_df.groupby(["country", "iso_code", "continent_name", "gdp_category"], as_index=False).agg({
-        "co2": "sum",
-        "population": "sum",
-        "gdp": "sum",
-    })
-
-    st.dataframe(agg_table.head(500))
-    csv = agg_table.to_csv(index=False)
-    years_label = _years_title(years_list)
-    st.download_button("Download CSV", data=csv, file_name=f"co2_filtered_{years_label}.csv")
-import streamlit as st
-from src.gdp_category import add_gdp_category
-from src.pages.overview.viz_map import choropleth_co2
-from src.pages.overview.viz_continent_bar import total_co2_by_continent
-from src.pages.overview.viz_sunburst import sunburst_co2, sunburst_co2_percapita
-from src.pages.overview.viz_top10 import top10_countries_by_metric, top10_co2_with_gdp, top10_by_co2_metric
-import pandas as pd
-from typing import Optional, Iterable, Union, List
-
-
-def _normalize_years(years: Union[int, Iterable[int], None]) -> Optional[List[int]]:
-    if years is None:
-        return None
-    if isinstance(years, int):
-        return [years]
-    try:
-        return list(years)
-    except Exception:
-        return None
-
-
-def _years_title(years_list: Optional[List[int]]) -> str:
-    if not years_list:
-        return "all"
-    years_sorted = sorted(years_list)
-    if len(years_sorted) == 1:
-        return str(years_sorted[0])
-    if years_sorted[-1] - years_sorted[0] == len(years_sorted) - 1:
-        return f"{years_sorted[0]}–{years_sorted[-1]}"
-    return ",".join(map(str, years_sorted))
-
-
-def _cagr(start: float, end: float, periods: int) -> Optional[float]:
-    try:
-        if start is None or end is None or start == 0 or periods <= 0:
-            return None
-        return (end / start) ** (1.0 / periods) - 1.0
-    except Exception:
-        return None
-
-
-def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], selected_continents: list):
+def render_overview(data_dir: str, years: Union[int, Iterable[int], None], selected_continents: list):
     """Render the Overview page into the current Streamlit app context.
 
     Inputs:
-      - df: loaded DataFrame (raw from loader)
+      - data_dir: directory passed to `load_data`; every section is built from that frame
       - years: int, iterable of ints, or None (all years)
       - selected_continents: list of continent names to include
     """
-    # Ensure GDP categories are present (tertile per year)
-    df_with_cat = add_gdp_category(df)
-
+    # GDP categories (tertile per year), the filtered selections and the figures come from
+    # caches keyed on the sidebar selection and `data_dir`
     years_list = _normalize_years(years)
+    years_key = tuple(sorted(years_list)) if years_list is not None else None
+    continents_key = tuple(sorted(selected_continents)) if selected_continents else None
 
-    # Build a working selection filtered by years and continents for table / simple aggregations
-    if years_list is None:
-        df_sel = df_with_cat.copy()
-    else:
-        df_sel = df_with_cat[df_with_cat["year"].isin(years_list)].copy()
+    # With every year deselected nothing can match, so each section shows its placeholder
+    # without building selections or figures. Headers and widgets are still drawn, so the
+    # chart options keep their state while the user swaps years (Streamlit drops the state
+    # of widgets left undrawn). An empty continent selection means "all continents".
+    no_years = years_list is not None and not years_list
 
-    if selected_continents:
-        df_sel = df_sel[df_sel["continent_name"].isin(selected_continents)].copy()
+    # Build a working selection filtered by years and continents for table / simple aggregations
+    df_sel = None if no_years else _overview_selection(years_key, continents_key, data_dir)
 
     # (GDP category filter removed per user request)
 
     # Global summary: total global CO2 and CO2 per capita (sum across selected years)
     st.subheader("Global summary")
-    if df_sel.empty:
+    if no_years or df_sel.empty:
         st.write("No data for selected filters")
     else:
-        # ensure numeric
-        for col in ("co2", "population"):
-            if col in df_sel.columns:
-                df_sel[col] = pd.to_numeric(df_sel[col], errors="coerce")
-
+        # load_data types co2 and population as floats, so they are summed as-is
         total_co2 = df_sel["co2"].sum(min_count=1)
         total_pop = df_sel["population"].sum(min_count=1)
 
@@ -332,19 +194,15 @@ def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], se
     left, mid, right = st.columns([1, 3, 1])
     with mid:
         st.subheader("World choropleth — Total CO2")
-        # Prepare df for maps (apply continent + gdp filters)
-        df_map = df_with_cat.copy()
-        if selected_continents:
-            df_map = df_map[df_map["continent_name"].isin(selected_continents)].copy()
-
-        fig_map_total = choropleth_co2(df_map, years_list, color_col="co2")
+        map_figs = {} if no_years else _map_figures(years_key, continents_key, data_dir)
+        fig_map_total = map_figs.get("co2")
         if fig_map_total is None:
             st.write("No map data for selected years")
         else:
             st.plotly_chart(fig_map_total, use_container_width=True)
 
         st.subheader("World choropleth — CO2 per capita")
-        fig_map_pc = choropleth_co2(df_map, years_list, color_col="co2_per_capita")
+        fig_map_pc = map_figs.get("co2_per_capita")
         if fig_map_pc is None:
             st.write("No map data for selected years")
         else:
@@ -352,14 +210,10 @@ def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], se
 
     # Continent bar appears full-width below the centered maps
     st.subheader("By Continent")
-    df_bar = df_with_cat.copy()
-    if selected_continents:
-        df_bar = df_bar[df_bar["continent_name"].isin(selected_continents)].copy()
-
     col_a, col_b = st.columns(2)
     with col_a:
         st.caption("Total CO2 by Continent")
-        fig_co2 = total_co2_by_continent(df_bar, years_list)
+        fig_co2 = None if no_years else _continent_figure(years_key, continents_key, "co2", data_dir)
         if fig_co2 is None:
             st.write("No continent CO2 data for selected years")
         else:
@@ -368,19 +222,11 @@ def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], se
     with col_b:
         st.caption("Total GDP by Continent")
         # use the generic continent function to plot GDP
-        try:
-            from src.pages.overview.viz_continent_bar import total_metric_by_continent
-        except Exception:
-            total_metric_by_continent = None
-
-        if total_metric_by_continent is None:
-            st.write("GDP chart unavailable")
+        fig_gdp = None if no_years else _continent_figure(years_key, continents_key, "gdp", data_dir)
+        if fig_gdp is None:
+            st.write("No continent GDP data for selected years")
         else:
-            fig_gdp = total_metric_by_continent(df_bar, years_list, metric="gdp")
-            if fig_gdp is None:
-                st.write("No continent GDP data for selected years")
-            else:
-                st.plotly_chart(fig_gdp, use_container_width=True)
+            st.plotly_chart(fig_gdp, use_container_width=True)
 
     st.markdown("---")
 
@@ -389,7 +235,7 @@ def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], se
     col1, col2 = st.columns(2)
     with col1:
         st.caption("Total CO2 (continent → GDP category → country)")
-        fig_sun = sunburst_co2(df_with_cat, years=years_list, continents=selected_continents)
+        fig_sun = None if no_years else _sunburst_figure(years_key, continents_key, data_dir)
         if fig_sun is None:
             st.write("No data for sunburst chart")
         else:
@@ -397,7 +243,7 @@ def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], se
 
     with col2:
         st.caption("CO2 per capita (continent → GDP category → country)")
-        fig_co2pc = sunburst_co2_percapita(df_with_cat, years=years_list, continents=selected_continents)
+        fig_co2pc = None if no_years else _sunburst_percapita_figure(years_key, continents_key, data_dir)
         if fig_co2pc is None:
             st.write("No data for CO2 per-capita sunburst")
         else:
@@ -406,15 +252,8 @@ def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], se
     st.markdown("---")
 
     st.subheader("Top 10 countries")
-    # We rank Top 10 by highest CO2, and for metrics co2_per_capita and population
-    # also overlay GDP as a secondary y-axis. The 'gdp' option is removed.
     metric = st.selectbox("Top metric", options=["co2", "co2_per_capita", "population"], index=0)
-    if metric == "co2":
-        fig_top10 = top10_co2_with_gdp(df_with_cat, years_list, continent_filter=selected_continents)
-    elif metric in ("co2_per_capita", "population"):
-        fig_top10 = top10_by_co2_metric(df_with_cat, years_list, metric=metric, continent_filter=selected_continents, add_gdp_line=True)
-    else:
-        fig_top10 = top10_countries_by_metric(df_with_cat, years_list, metric=metric, continent_filter=selected_continents)
+    fig_top10 = None if no_years else _top10_figure(years_key, continents_key, metric, data_dir)
     if fig_top10 is None:
         st.write("No data for Top 10 chart")
     else:
@@ -439,7 +278,11 @@ def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], se
         with cols[2]:
             show_trend = st.checkbox("Show trend line", value=True)
 
-        fig_corr = correlation_gdp_co2(df_with_cat, years=years_list, continents=selected_continents, log_x=log_x, log_y=log_y, show_trend=show_trend)
+        if no_years:
+            fig_corr = None
+        else:
+            corr_agg = _correlation_aggregate(years_key, continents_key, data_dir)
+            fig_corr = correlation_gdp_co2(corr_agg, log_x=log_x, log_y=log_y, show_trend=show_trend)
         if fig_corr is None:
             st.write("No data for correlation chart with selected filters")
         else:
@@ -448,15 +291,11 @@ def render_overview(df: pd.DataFrame, years: Union[int, Iterable[int], None], se
     st.markdown("---")
     st.subheader("Filtered data")
     # For the data table, show totals per country for the selected years and continents
-    table_df = df_sel
-
-    agg_table = table_df.groupby(["country", "iso_code", "continent_name", "gdp_category"], as_index=False).agg({
-        "co2": "sum",
-        "population": "sum",
-        "gdp": "sum",
-    })
+    if no_years:
+        st.write("No data for selected filters")
+        return
+    agg_table, csv = _overview_table(years_key, continents_key, data_dir)
 
     st.dataframe(agg_table.head(500))
-    csv = agg_table.to_csv(index=False)
     years_label = _years_title(years_list)
     st.download_button("Download CSV", data=csv, file_name=f"co2_filtered_{years_label}.csv")
@@ -2,6 +2,8 @@ import plotly.express as px
 import pandas as pd
 from typing import Iterable, Optional
 
+from src.data_loader import year_slice, years_slice
+
 
 def total_metric_by_continent(df: pd.DataFrame, years: Optional[Iterable[int]] = None, metric: str = "co2"):
     """Return a horizontal bar chart of total `metric` by continent for the given year(s).
@@ -9,22 +11,21 @@ def total_metric_by_continent(df: pd.DataFrame, years: Optional[Iterable[int]] =
     `years` can be None (use df as-is), an int, or an iterable of years. The function
     aggregates `metric` across the selection and shows a horizontal bar sorted descending.
     """
+    # The selection is only read (load_data already types the metrics as numbers), so
+    # it is neither copied nor coerced
     if years is None:
-        df_year = df.copy()
+        df_year = df
     elif isinstance(years, int):
-        df_year = df[df["year"] == years].copy()
+        df_year = year_slice(df, years)
     else:
-        df_year = df[df["year"].isin(years)].copy()
+        df_year = years_slice(df, years)
 
     if metric not in df_year.columns:
         # nothing to plot
         return None
 
-    # ensure numeric for chosen metric
-    df_year[metric] = pd.to_numeric(df_year.get(metric), errors="coerce")
-
-    cont = df_year.groupby("continent_name")[metric].sum().reset_index()
-    cont = cont.sort_values(metric, ascending=True)
+    # one chain: sum per continent, order ascending (largest ends up on top), then frame it
+    cont = df_year.groupby("continent_name", observed=True, sort=False)[metric].sum().sort_values().reset_index()
 
     # horizontal bar: x=metric, y=continent_name
     label = metric
@@ -43,11 +44,7 @@ def total_metric_by_continent(df: pd.DataFrame, years: Optional[Iterable[int]] =
     fig = px.bar(cont, x=metric, y="continent_name", orientation="h",
                  labels={metric: label, "continent_name": "Continent"},
                  title=title)
-
-    # ensure largest is at top by explicitly setting the category order from the sorted DataFrame
-    cont_order = cont["continent_name"].tolist()
-    fig.update_layout(yaxis={'categoryorder': 'array', 'categoryarray': cont_order})
-
+    # the category axis follows the trace order, which is already sorted
     return fig
 
 
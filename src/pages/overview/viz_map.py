@@ -1,24 +1,24 @@
-from typing import Optional, Iterable, Sequence
+from typing import Dict, Optional, Iterable, Sequence
 import plotly.express as px
 import pandas as pd
 
+from src.data_loader import year_slice, years_slice
+
 
 # Default green->red diverging scale (low=green, high=red)
 DEFAULT_GREEN_RED = px.colors.diverging.RdYlGn[::-1]
 
 
-def choropleth_co2(df: pd.DataFrame, years: Optional[Iterable[int]] = None, color_col: Optional[str] = None, color_scale: Optional[Sequence[str]] = None):
-    """Create a choropleth for given year(s).
+def _map_rows(df: pd.DataFrame, years: Optional[Iterable[int]]) -> pd.DataFrame:
+    # The years are sliced out of the year-sorted frame before the ISO-code mask is
+    # applied; the figure only reads the selection, so it is not copied
+    df_year = df
+    if years is not None:
+        df_year = year_slice(df, years) if isinstance(years, int) else years_slice(df, years)
+    return df_year[df_year["iso_code"].notna()]
 
-    `years` can be None (use df as-is), an int, or an iterable of years.
-    """
-    if years is None:
-        df_year = df.dropna(subset=["iso_code"]).copy()
-    elif isinstance(years, int):
-        df_year = df[df["year"] == years].dropna(subset=["iso_code"]).copy()
-    else:
-        df_year = df[df["year"].isin(years)].dropna(subset=["iso_code"]).copy()
 
+def _choropleth(df_year: pd.DataFrame, years: Optional[Iterable[int]], color_col: Optional[str], color_scale: Optional[Sequence[str]]):
     if color_col and color_col in df_year.columns:
         col = color_col
     else:
@@ -40,4 +40,21 @@ def choropleth_co2(df: pd.DataFrame, years: Optional[Iterable[int]] = None, colo
                         title=title)
     fig.update_layout(margin=dict(l=0, r=0, t=35, b=0))
     return fig
-    
+
+
+def choropleth_co2(df: pd.DataFrame, years: Optional[Iterable[int]] = None, color_col: Optional[str] = None, color_scale: Optional[Sequence[str]] = None):
+    """Create a choropleth for given year(s).
+
+    `years` can be None (use df as-is), an int, or an iterable of years.
+    """
+    return _choropleth(_map_rows(df, years), years, color_col, color_scale)
+
+
+def choropleth_co2_many(df: pd.DataFrame, years: Optional[Iterable[int]] = None, color_cols: Sequence[str] = ("co2", "co2_per_capita"),
+                        color_scale: Optional[Sequence[str]] = None) -> Dict[str, object]:
+    """Create one choropleth per entry of `color_cols`, selecting the rows only once.
+
+    Returns a dict mapping each color column to its figure (None where there is no data).
+    """
+    df_year = _map_rows(df, years)
+    return {col: _choropleth(df_year, years, col, color_scale) for col in color_cols}
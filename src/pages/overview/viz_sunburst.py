@@ -1,18 +1,72 @@
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 from typing import Optional, Iterable, List, Sequence
 
+from src.data_loader import year_slice, years_slice
+
 
 # Default green->red diverging scale (low=green, high=red)
 DEFAULT_GREEN_RED = px.colors.diverging.RdYlGn[::-1]
 
 
 def _select_years(df: pd.DataFrame, years: Optional[Iterable[int]]):
+    # Callers only read the selection, so it is returned without a copy
     if years is None:
-        return df.copy()
+        return df
     if isinstance(years, int):
-        return df[df["year"] == years].copy()
-    return df[df["year"].isin(years)].copy()
+        return year_slice(df, years)
+    return years_slice(df, years)
+
+
+# Hierarchy shown by both sunbursts, from the centre outwards
+SUNBURST_PATH = ["continent_name", "gdp_category", "country"]
+
+
+def _value_sunburst(agg: pd.DataFrame, value_col: str, scale: Sequence[str], title: str) -> go.Figure:
+    """Build the figure `px.sunburst(agg, path=SUNBURST_PATH, values=value_col, color=value_col)` draws.
+
+    The node tree is assembled with one groupby per level: leaves first, then each parent
+    level, with values summed over the children and every node colored by the
+    value-weighted mean of its leaves (how plotly express colors the tree).
+    """
+    keys = agg[SUNBURST_PATH].astype(str)
+    values = agg[value_col].to_numpy(dtype=float)
+    nodes = keys.assign(_value=values, _weighted=values * values)
+
+    ids, labels, parents, node_values, colors = [], [], [], [], []
+    for depth in range(len(SUNBURST_PATH), 0, -1):
+        level_keys = SUNBURST_PATH[:depth]
+        level = nodes.groupby(level_keys, sort=True)[["_value", "_weighted"]].sum().reset_index()
+        # ids are the "/"-joined path; a node's parent id is its path minus the last part
+        node_ids = level[level_keys[0]]
+        parent = pd.Series("", index=level.index)
+        for col in level_keys[1:]:
+            parent = node_ids
+            node_ids = node_ids + "/" + level[col]
+        ids.append(node_ids.to_numpy())
+        labels.append(level[level_keys[-1]].to_numpy())
+        parents.append(parent.to_numpy())
+        level_values = level["_value"].to_numpy()
+        node_values.append(level_values)
+        # zero-valued nodes get no color, as in plotly express
+        level_colors = np.full(len(level), np.nan)
+        np.divide(level["_weighted"].to_numpy(), level_values, out=level_colors, where=level_values != 0)
+        colors.append(level_colors)
+
+    fig = go.Figure(
+        go.Sunburst(
+            ids=np.concatenate(ids), labels=np.concatenate(labels), parents=np.concatenate(parents),
+            values=np.concatenate(node_values), branchvalues="total", name="", domain=dict(x=[0.0, 1.0], y=[0.0, 1.0]),
+            marker=dict(colors=np.concatenate(colors), coloraxis="coloraxis"),
+            hovertemplate=(f"labels=%{{label}}<br>{value_col}_sum=%{{value}}<br>parent=%{{parent}}"
+                           f"<br>id=%{{id}}<br>{value_col}=%{{color}}<extra></extra>"),
+        ),
+        layout=go.Layout(title=title, coloraxis=dict(colorscale=list(scale), colorbar=dict(title=dict(text=value_col))),
+                         legend=dict(tracegroupgap=0)),
+    )
+    return fig
 
 
 def sunburst_co2(df: pd.DataFrame, years: Optional[Iterable[int]] = None, continents: Optional[List[str]] = None, color_scale: Optional[Sequence[str]] = None):
@@ -29,11 +83,14 @@ def sunburst_co2(df: pd.DataFrame, years: Optional[Iterable[int]] = None, contin
         return None
 
     # Aggregate total CO2 per country so duplicates collapse correctly for multi-year
-    df_year["co2"] = pd.to_numeric(df_year.get("co2"), errors="coerce")
-    agg = df_year.groupby(["continent_name", "gdp_category", "country"], as_index=False).agg({"co2": "sum"})
-    agg = agg.dropna(subset=["co2"]) if not agg.empty else agg
-    if agg.empty:
+    # (load_data already types co2 as float)
+    agg = df_year.groupby(["continent_name", "gdp_category", "country"], as_index=False, observed=True).agg({"co2": "sum"})
+    # one NaN scan both drops unusable rows and answers "anything left?"
+    keep = ~np.isnan(agg["co2"].to_numpy(dtype=float))
+    if not keep.any():
         return None
+    if not keep.all():
+        agg = agg[keep]
 
     title = "CO2 sunburst"
     if years is not None:
@@ -43,9 +100,7 @@ def sunburst_co2(df: pd.DataFrame, years: Optional[Iterable[int]] = None, contin
             title = f"{title} — {','.join(str(int(y)) for y in sorted(set(years)))}"
 
     scale = color_scale or DEFAULT_GREEN_RED
-    fig = px.sunburst(agg, path=["continent_name", "gdp_category", "country"], values="co2",
-                      color="co2", color_continuous_scale=scale,
-                      title=title)
+    fig = _value_sunburst(agg, "co2", scale, title)
     fig.update_layout(margin=dict(t=35, l=0, r=0, b=0))
     return fig
 
@@ -63,20 +118,25 @@ def sunburst_co2_percapita(df: pd.DataFrame, years: Optional[Iterable[int]] = No
     if df_year.empty:
         return None
 
-    df_year["co2"] = pd.to_numeric(df_year.get("co2"), errors="coerce")
-    df_year["population"] = pd.to_numeric(df_year.get("population"), errors="coerce")
-
-    agg = df_year.groupby(["continent_name", "gdp_category", "country"], as_index=False).agg({
+    # load_data already types co2 and population as floats
+    agg = df_year.groupby(["continent_name", "gdp_category", "country"], as_index=False, observed=True).agg({
         "co2": "sum",
         "population": "sum",
     })
     if agg.empty:
         return None
 
-    agg["co2_per_capita"] = agg.apply(lambda r: (r["co2"] / r["population"]) if r["population"] and not pd.isna(r["population"]) else pd.NA, axis=1)
-    agg = agg.dropna(subset=["co2_per_capita"]) if not agg.empty else agg
-    if agg.empty:
+    # Per-capita in one vectorized divide; zero or missing population leaves NaN
+    co2 = agg["co2"].to_numpy(dtype=float)
+    pop = agg["population"].to_numpy(dtype=float)
+    per_capita = np.full(len(agg), np.nan)
+    np.divide(co2, pop, out=per_capita, where=(pop != 0) & ~np.isnan(pop))
+    agg["co2_per_capita"] = per_capita
+    keep = ~np.isnan(per_capita)
+    if not keep.any():
         return None
+    if not keep.all():
+        agg = agg[keep]
 
     title = "CO2 per capita sunburst"
     if years is not None:
@@ -86,8 +146,6 @@ def sunburst_co2_percapita(df: pd.DataFrame, years: Optional[Iterable[int]] = No
             title = f"{title} — {','.join(str(int(y)) for y in sorted(set(years)))}"
 
     scale = color_scale or DEFAULT_GREEN_RED
-    fig = px.sunburst(agg, path=["continent_name", "gdp_category", "country"], values="co2_per_capita",
-                      color="co2_per_capita", color_continuous_scale=scale,
-                      title=title)
+    fig = _value_sunburst(agg, "co2_per_capita", scale, title)
     fig.update_layout(margin=dict(t=35, l=0, r=0, b=0))
     return fig
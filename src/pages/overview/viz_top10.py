@@ -1,8 +1,11 @@
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from typing import Optional, List, Iterable, Union
 
+from src.data_loader import years_slice
+
 
 def _normalize_years(years: Union[int, Iterable[int], None]) -> Optional[List[int]]:
     if years is None:
@@ -26,42 +29,82 @@ def _years_title(years_list: Optional[List[int]]) -> str:
     return ",".join(map(str, years_sorted))
 
 
-def top10_countries_by_metric(df: pd.DataFrame, years: Union[int, Iterable[int], None], metric: str = "co2", continent_filter: Optional[List[str]] = None):
-    """Return a Plotly bar figure with top 10 countries by `metric` for `years`.
+def _per_capita(agg: pd.DataFrame) -> np.ndarray:
+    """Return co2 / population for the aggregated rows; zero or missing population gives NaN."""
+    co2 = agg["co2"].to_numpy(dtype=float)
+    pop = agg["population"].to_numpy(dtype=float)
+    out = np.full(len(agg), np.nan)
+    np.divide(co2, pop, out=out, where=(pop != 0) & ~np.isnan(pop))
+    return out
 
-    `years` may be an int, an iterable of ints, or None (meaning all years).
-    If `continent_filter` is provided, filter to those continents first.
-    Aggregation: sums numeric columns across selected years; recomputes per-capita metrics.
-    """
-    years_list = _normalize_years(years)
 
-    if years_list is None:
-        df_sel = df.copy()
-    else:
-        df_sel = df[df["year"].isin(years_list)].copy()
+def country_totals(df: pd.DataFrame, years: Union[int, Iterable[int], None], continent_filter: Optional[List[str]] = None) -> pd.DataFrame:
+    """Return co2, gdp and population summed per country over the selection, plus per-capita CO2.
 
+    `years` may be an int, an iterable of ints, or None (all years); `continent_filter`
+    restricts the rows to those continents. The result is the `agg` frame the three
+    top-10 builders draw from.
+    """
+    years_list = _normalize_years(years)
+    # the selection is only grouped, never written to, so it is not copied
+    df_sel = df if years_list is None else years_slice(df, years_list)
     if continent_filter:
-        df_sel = df_sel[df_sel["continent_name"].isin(continent_filter)].copy()
+        df_sel = df_sel[df_sel["continent_name"].isin(continent_filter)]
 
-    if df_sel.empty:
-        return None
+    agg = _sum_by_country(df_sel, ["co2", "gdp", "population"])
+    agg["co2_per_capita"] = _per_capita(agg)
+    return agg
 
-    # Aggregate numeric columns per country across selected years
-    agg = df_sel.groupby("country", as_index=False).agg({
-        "co2": "sum",
-        "gdp": "sum",
-        "population": "sum",
-    })
 
-    # Recompute per-capita metrics where needed
-    agg["co2_per_capita"] = agg.apply(lambda r: (r["co2"] / r["population"]) if r["population"] and not pd.isna(r["population"]) else pd.NA, axis=1)
+def _sum_by_country(df_sel: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Return `columns` summed per country, like `groupby("country").sum(min_count=1)`.
 
-    if metric not in agg.columns:
+    Missing values are skipped, and a country with no value in a column gets NaN there.
+    Countries without rows in `df_sel` are left out. A categorical `country` (as returned
+    by `load_data`) is summed with `np.bincount` over the category codes, and its countries
+    come out in category order. Other frames use the groupby.
+    """
+    col = df_sel["country"]
+    if not isinstance(col.dtype, pd.CategoricalDtype):
+        return df_sel.groupby("country", as_index=False, observed=True, sort=False)[columns].sum(min_count=1)
+    codes = col.cat.codes.to_numpy()
+    valid = codes >= 0
+    codes = codes[valid]
+    n_codes = len(col.cat.categories)
+    present = np.bincount(codes, minlength=n_codes) > 0
+    out = {"country": pd.Categorical.from_codes(np.flatnonzero(present), dtype=col.dtype)}
+    for name in columns:
+        values = df_sel[name].to_numpy(dtype=float)[valid]
+        known = ~np.isnan(values)
+        # (bincount of an empty selection comes back as ints, hence the cast)
+        sums = np.bincount(codes[known], weights=values[known], minlength=n_codes).astype(float, copy=False)
+        sums[np.bincount(codes[known], minlength=n_codes) == 0] = np.nan
+        out[name] = sums[present].astype(df_sel[name].dtype)
+    return pd.DataFrame(out)
+
+
+def _top10_rows(agg: pd.DataFrame, select_col: str) -> Optional[pd.DataFrame]:
+    """Return the 10 countries of `agg` with the largest `select_col`, or None if there are none.
+
+    Shared by the three builders, which differ only in the figure drawn from these rows.
+    """
+    if select_col not in agg.columns:
         return None
+    # nlargest of a non-empty frame is never empty, so one length check covers both an
+    # empty aggregate and one without any value in `select_col`
+    top = agg.dropna(subset=[select_col]).nlargest(10, select_col)
+    return top if len(top) else None
 
-    agg = agg.dropna(subset=[metric])
-    top = agg.sort_values(metric, ascending=False).head(10)
-    if top.empty:
+
+def top10_countries_by_metric(agg: pd.DataFrame, years: Union[int, Iterable[int], None], metric: str = "co2"):
+    """Return a Plotly bar figure with top 10 countries by `metric` for `years`.
+
+    `agg` is the per-country aggregate of the selection, from `country_totals`.
+    `years` may be an int, an iterable of ints, or None (meaning all years); it is used for the title.
+    """
+    years_list = _normalize_years(years)
+    top = _top10_rows(agg, metric)
+    if top is None:
         return None
 
     title_years = _years_title(years_list)
@@ -69,112 +112,61 @@ def top10_countries_by_metric(df: pd.DataFrame, years: Union[int, Iterable[int],
     return fig
 
 
-def top10_co2_with_gdp(df: pd.DataFrame, years: Union[int, Iterable[int], None], continent_filter: Optional[List[str]] = None):
+def top10_co2_with_gdp(agg: pd.DataFrame, years: Union[int, Iterable[int], None]):
     """Return a dual-axis Plotly figure showing Top 10 countries by CO2 (bars) with GDP as a line (secondary y-axis).
 
-    Aggregates across `years` if provided.
+    `agg` is the per-country aggregate of the selection, from `country_totals`.
     """
     years_list = _normalize_years(years)
-    if years_list is None:
-        df_sel = df.copy()
-    else:
-        df_sel = df[df["year"].isin(years_list)].copy()
-
-    if continent_filter:
-        df_sel = df_sel[df_sel["continent_name"].isin(continent_filter)].copy()
-
-    if df_sel.empty:
-        return None
-
-    # Aggregate per country
-    agg = df_sel.groupby("country", as_index=False).agg({
-        "co2": "sum",
-        "gdp": "sum",
-    })
-
-    agg["co2"] = pd.to_numeric(agg["co2"], errors="coerce")
-    agg["gdp"] = pd.to_numeric(agg["gdp"], errors="coerce")
-
-    agg = agg.dropna(subset=["co2"]) if not agg.empty else agg
-    if agg.empty:
-        return None
-
-    top = agg.sort_values("co2", ascending=False).head(10)
-    if top.empty:
+    top = _top10_rows(agg, "co2")
+    if top is None:
         return None
 
+    # numeric traces stay numpy arrays (co2 is float32) so Plotly ships them as typed
+    # binary arrays rather than JSON number lists
     countries = top["country"].tolist()
-    co2_vals = top["co2"].tolist()
-    gdp_vals = top["gdp"].fillna(0).tolist()
-
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=countries, y=co2_vals, name="CO2 (metric tons)"))
-    fig.add_trace(go.Scatter(x=countries, y=gdp_vals, name="GDP (USD)", yaxis="y2", mode="lines+markers"))
+    co2_vals = top["co2"].to_numpy()
+    gdp_vals = np.nan_to_num(top["gdp"].to_numpy())
 
+    # traces and layout both go into the constructor, so the figure is validated once
     title_years = _years_title(years_list)
-    fig.update_layout(
+    layout = dict(
         title=f"Top 10 countries by CO2 with GDP — {title_years}",
         xaxis=dict(title="Country"),
         yaxis=dict(title="CO2 (metric tons)"),
         yaxis2=dict(title="GDP (USD)", overlaying="y", side="right"),
         legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01),
     )
+    fig = go.Figure(data=[
+        go.Bar(x=countries, y=co2_vals, name="CO2 (metric tons)"),
+        go.Scatter(x=countries, y=gdp_vals, name="GDP (USD)", yaxis="y2", mode="lines+markers"),
+    ], layout=layout)
 
     return fig
 
 
-def top10_by_co2_metric(df: pd.DataFrame, years: Union[int, Iterable[int], None], metric: str = "co2", continent_filter: Optional[List[str]] = None, add_gdp_line: bool = True):
+def top10_by_co2_metric(agg: pd.DataFrame, years: Union[int, Iterable[int], None], metric: str = "co2", add_gdp_line: bool = True):
     """Return a Plotly figure for Top 10 countries (ranked by CO2) showing `metric` as bars.
 
     If add_gdp_line is True, overlay GDP as a secondary y-axis line.
     The Top 10 selection is always based on the highest aggregated CO2 values for the selected years.
+    `agg` is the per-country aggregate of the selection, from `country_totals`.
     """
     years_list = _normalize_years(years)
-    if years_list is None:
-        df_sel = df.copy()
-    else:
-        df_sel = df[df["year"].isin(years_list)].copy()
-
-    if continent_filter:
-        df_sel = df_sel[df_sel["continent_name"].isin(continent_filter)].copy()
-
-    if df_sel.empty:
-        return None
-
-    # Aggregate per country
-    agg = df_sel.groupby("country", as_index=False).agg({
-        "co2": "sum",
-        "gdp": "sum",
-        "population": "sum",
-    })
-
-    agg["co2"] = pd.to_numeric(agg["co2"], errors="coerce")
-    agg["gdp"] = pd.to_numeric(agg["gdp"], errors="coerce")
-    agg["population"] = pd.to_numeric(agg["population"], errors="coerce")
-
-    # Recompute per-capita metric
-    agg["co2_per_capita"] = agg.apply(lambda r: (r["co2"] / r["population"]) if r["population"] and not pd.isna(r["population"]) else pd.NA, axis=1)
-
     # Select top 10 by the requested metric (fall back to CO2 if metric not present)
     select_col = metric if metric in agg.columns else "co2"
-    agg = agg.dropna(subset=[select_col]) if not agg.empty else agg
-    if agg.empty:
-        return None
-
-    top = agg.sort_values(select_col, ascending=False).head(10)
-    if top.empty:
+    top = _top10_rows(agg, select_col)
+    if top is None:
         return None
 
     countries = top["country"].tolist()
-    metric_vals = top[metric].fillna(0).tolist() if metric in top.columns else [0] * len(countries)
-    gdp_vals = top["gdp"].fillna(0).tolist()
+    metric_vals = np.nan_to_num(top[metric].to_numpy()) if metric in top.columns else [0] * len(countries)
+    gdp_vals = np.nan_to_num(top["gdp"].to_numpy())
 
     # Build figure: bars for the metric, optional GDP line on secondary y-axis
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=countries, y=metric_vals, name=f"{metric}"))
-
+    traces = [go.Bar(x=countries, y=metric_vals, name=f"{metric}")]
     if add_gdp_line:
-        fig.add_trace(go.Scatter(x=countries, y=gdp_vals, name="GDP (USD)", yaxis="y2", mode="lines+markers"))
+        traces.append(go.Scatter(x=countries, y=gdp_vals, name="GDP (USD)", yaxis="y2", mode="lines+markers"))
 
     # Titles and axis labels
     y_title = metric
@@ -196,5 +188,6 @@ def top10_by_co2_metric(df: pd.DataFrame, years: Union[int, Iterable[int], None]
     if add_gdp_line:
         layout["yaxis2"] = dict(title="GDP (USD)", overlaying="y", side="right")
 
-    fig.update_layout(**layout)
+    # the layout goes into the constructor with the traces, so the figure is validated once
+    fig = go.Figure(data=traces, layout=layout)
     return fig
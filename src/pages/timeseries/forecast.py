@@ -30,45 +30,42 @@ def forecast_series(years: pd.Series, values: pd.Series, steps: int = 5, order=(
     last_year = int(series_clean.index.max())
     forecast_years = np.arange(last_year + 1, last_year + 1 + steps)
 
+    preds, lower, upper = _fit_and_extrapolate(series_clean, steps, order)
+
+    # Build result DataFrame combining history and forecast: observed values on the
+    # union of years, predictions and CI on the forecast years only
+    all_index = series.index.union(pd.Index(forecast_years, name="year"))
+    is_forecast = all_index.isin(forecast_years)
+    result = pd.DataFrame({"y": series.reindex(all_index)}, index=all_index)
+    for col, arr in (("y_pred", preds), ("y_lower", lower), ("y_upper", upper)):
+        out = np.full(len(all_index), np.nan)
+        out[is_forecast] = arr
+        result[col] = out
+
+    result = result.reset_index().rename(columns={"index": "year"})
+    return result
+
+
+def _fit_and_extrapolate(series_clean: pd.Series, steps: int, order) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fit SARIMAX to `series_clean` and return (predictions, lower, upper) for `steps` years.
+
+    Only the Kalman filter is needed to forecast, so the fitted parameters are applied
+    with `filter` rather than the smoothing pass and parameter covariance that a full
+    `fit()` result computes. Falls back to a persistence forecast (mean +/- 10%) if
+    fitting fails.
+    """
     # Fit a simple SARIMAX model (no seasonal component)
     try:
         model = SARIMAX(series_clean, order=order, enforce_stationarity=False, enforce_invertibility=False)
-        res = model.fit(disp=False)
+        params = model.fit(disp=False, return_params=True)
+        res = model.filter(params, cov_type="none")
     except Exception:
         # Fall back to a very simple persistence forecast if fitting fails
-        mean_val = series_clean.mean()
-        preds = np.full(steps, mean_val)
-        lower = preds - 0.1 * np.abs(preds)
-        upper = preds + 0.1 * np.abs(preds)
-        pred_index = pd.Index(forecast_years, name="year")
-        df = pd.DataFrame({"y": series.reindex(series.index.union(pred_index)),
-                           "y_pred": np.nan,
-                           "y_lower": np.nan,
-                           "y_upper": np.nan})
-        df.loc[pred_index, ["y_pred", "y_lower", "y_upper"]] = np.vstack([preds, lower, upper]).T
-        df = df.reset_index()
-        return df
+        preds = np.full(steps, series_clean.mean())
+        return preds, preds - 0.1 * np.abs(preds), preds + 0.1 * np.abs(preds)
 
     # Produce forecast and 95% confidence intervals
     pred = res.get_forecast(steps=steps)
-    pred_mean = pred.predicted_mean
-    conf = pred.conf_int(alpha=0.05)
-
-    # Build result DataFrame combining history and forecast
-    all_index = series.index.union(pd.Index(forecast_years, name="year"))
-    result = pd.DataFrame(index=all_index)
-    result["y"] = series.reindex(all_index)
-    result["y_pred"] = np.nan
-    result["y_lower"] = np.nan
-    result["y_upper"] = np.nan
-
-    # Fill forecast portion
-    result.loc[forecast_years, "y_pred"] = pred_mean.values
     # conf columns are named like 'lower y' and 'upper y'
-    lower_col = conf.columns[0]
-    upper_col = conf.columns[1]
-    result.loc[forecast_years, "y_lower"] = conf[lower_col].values
-    result.loc[forecast_years, "y_upper"] = conf[upper_col].values
-
-    result = result.reset_index().rename(columns={"index": "year"})
-    return result
+    conf = np.asarray(pred.conf_int(alpha=0.05))
+    return np.asarray(pred.predicted_mean), conf[:, 0], conf[:, 1]
@@ -1,12 +1,97 @@
+import os
+
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 
+from src.data_loader import load_data, yearly_totals
+
+
+# Keyed on the selection and `data_dir` only (the frame comes from the cached
+# `load_data`), so re-selecting the same countries skips rebuilding the figure
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cumulative_trends_figure(countries: tuple, data_dir: str = "data"):
+    from src.pages.timeseries.viz_accumulation import plot_cumulative_trends
+    return plot_cumulative_trends(load_data(data_dir), list(countries))
+
+
+# The forecast figures refit SARIMAX when built; caching them per (selection, horizon)
+# means a rerun with the same inputs reuses the fitted forecast instead of refitting
+@st.cache_data(max_entries=64, show_spinner=False)
+def _global_forecast_figure(metric: str, steps: int, data_dir: str = "data"):
+    from src.pages.timeseries.viz_timeseries import global_forecast_plot
+    return global_forecast_plot(load_data(data_dir), metric=metric, steps=steps,
+                                totals=yearly_totals(metric, data_dir))
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _gdp_forecast_figure(country: str, steps: int, data_dir: str = "data"):
+    from src.pages.timeseries.viz_timeseries import country_gdp_forecast_plot
+    return country_gdp_forecast_plot(load_data(data_dir), country, steps=steps)
+
+
+@st.cache_data(show_spinner=False)
+def _country_options(data_dir: str = "data"):
+    """Return (country_list, top10) for the page selectors, derived once per data load.
+
+    `top10` holds the countries with the highest total CO2, the default selection of the
+    cumulative plot.
+    """
+    df = load_data(data_dir)
+    country_list = sorted(df["country"].dropna().unique())
+    if "co2" in df.columns:
+        totals = df.groupby("country", sort=False, dropna=True, observed=True)["co2"].sum(min_count=1)
+        top10 = totals.dropna().nlargest(10).index.tolist()
+    else:
+        top10 = country_list[:10]
+    return country_list, top10
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _country_history(country: str, data_dir: str = "data") -> pd.DataFrame:
+    """Return the country's `year` and charted numeric columns, in year order.
+
+    load_data keeps rows in year order and types these columns as floats, so this is a
+    single selection: no sort, copy or coercion.
+    """
+    df = load_data(data_dir)
+    numeric_cols = [c for c in ("gdp", "co2", "co2_per_capita", "population") if c in df.columns]
+    return df.loc[df["country"] == country, ["year", *numeric_cols]]
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _country_csv(country: str, data_dir: str = "data") -> str:
+    """Return `_country_history` as CSV text, serialized once per country.
 
-def render_country_page(df: pd.DataFrame):
+    The download button needs its payload on every rerun; caching it means `to_csv`
+    runs only when the selected country changes, not on every other widget change.
+    """
+    return _country_history(country, data_dir).to_csv(index=False)
+
+
+# Precomputed forecasts written by scripts/generate_forecasts.py
+FORECASTS_PATH = "data/forecasts_co2.csv"
+
+
+@st.cache_resource(show_spinner=False)
+def _forecast_index(path: str, mtime: float) -> dict:
+    """Read the forecasts CSV once and index it as `(country, metric) -> year-sorted rows`.
+
+    `mtime` is part of the cache key, so a regenerated file is picked up on the next
+    rerun. The frames are shared across sessions (`st.cache_resource`); callers must not
+    mutate them.
+    """
+    fdf = pd.read_csv(path)
+    return {key: group.sort_values("year") for key, group in fdf.groupby(["country", "metric"], sort=False)}
+
+
+def render_country_page(data_dir: str):
     """Render the Country page as a timeseries analysis with line charts and a CO2 forecast.
 
+    Every chart, table and download is built from `load_data(data_dir)`.
+
     Shows:
     - Title: "Timeseries analysis"
     - Line charts for historical `co2`, `co2_per_capita`, and `population`.
@@ -15,20 +100,10 @@ def render_country_page(df: pd.DataFrame):
     """
     st.subheader("Timeseries analysis")
 
-    country_list = sorted(df["country"].dropna().unique())
+    country_list, top10 = _country_options(data_dir)
 
     # Accumulation (multi-country) — allow selecting which countries to show
-    from src.pages.timeseries.viz_accumulation import plot_cumulative_trends
-    # Forecast plotting helpers (global and GDP per-country)
-    from src.pages.timeseries.viz_timeseries import global_forecast_plot, country_gdp_forecast_plot
-
     # default: show top 10 countries by total CO2 (baseline)
-    if "co2" in df.columns:
-        totals = df.groupby("country", dropna=True)["co2"].sum(min_count=1)
-        top10 = totals.sort_values(ascending=False).dropna().head(10).index.tolist()
-    else:
-        top10 = country_list[:10]
-
     selected_countries = st.multiselect(
         "Countries — cumulative plot",
         options=country_list,
@@ -36,7 +111,7 @@ def render_country_page(df: pd.DataFrame):
         key="accum_countries",
     )
 
-    fig_acc = plot_cumulative_trends(df, selected_countries)
+    fig_acc = _cumulative_trends_figure(tuple(selected_countries), data_dir)
     if fig_acc is None:
         st.write("No cumulative data available for selected countries")
     else:
@@ -47,7 +122,7 @@ def render_country_page(df: pd.DataFrame):
 
     # Global CO2 total forecast (aggregate across countries)
     try:
-        fig_global = global_forecast_plot(df, metric="co2", steps=steps)
+        fig_global = _global_forecast_figure("co2", steps, data_dir)
         st.subheader("Global CO2 forecast (total)")
         st.plotly_chart(fig_global, use_container_width=True)
     except Exception as e:
@@ -55,46 +130,43 @@ def render_country_page(df: pd.DataFrame):
 
     sel_country = st.selectbox("Choose a country", options=country_list, index=0)
 
-    cdf = df[df["country"] == sel_country].sort_values("year").copy()
+    # the chart, table and CSV download all use this one selection
+    cdf = _country_history(sel_country, data_dir)
     if cdf.empty:
         st.write("No data for selected country")
         return
 
-    # Ensure numeric columns
-    for col in ("gdp", "co2", "co2_per_capita", "population"):
-        if col in cdf.columns:
-            cdf[col] = pd.to_numeric(cdf.get(col), errors="coerce")
-
-
-    # CO2 line chart (with forecast overlay if available)
-    fig_co2 = go.Figure()
+    # CO2 line chart (with forecast overlay if available); traces are collected first
+    # and the figure is built once, instead of validating it again on every add_trace
+    co2_traces = []
     if "co2" in cdf.columns:
-        fig_co2.add_trace(go.Scatter(x=cdf["year"], y=cdf["co2"], mode="lines+markers", name="Observed CO2 (Mt)"))
+        co2_traces.append(go.Scatter(x=cdf["year"], y=cdf["co2"], mode="lines+markers", name="Observed CO2 (Mt)"))
 
     # try to load forecast data for this country (pre-computed forecasts file)
     try:
-        fdf = pd.read_csv("data/forecasts_co2.csv")
-        f_country = fdf[(fdf["country"] == sel_country) & (fdf["metric"] == "co2")].copy()
-        if not f_country.empty:
-            # prediction columns: y_pred, y_lower, y_upper
-            f_country = f_country.sort_values("year")
-            if "y_pred" in f_country.columns and f_country["y_pred"].notna().any():
-                fig_co2.add_trace(go.Scatter(x=f_country["year"], y=f_country["y_pred"], mode="lines", name="Forecast CO2", line=dict(dash="dash")))
-                if "y_lower" in f_country.columns and "y_upper" in f_country.columns:
-                    fig_co2.add_trace(go.Scatter(x=f_country["year"].tolist() + f_country["year"].tolist()[::-1],
-                                                 y=f_country["y_upper"].tolist() + f_country["y_lower"].tolist()[::-1],
-                                                 fill='toself', fillcolor='rgba(0,100,80,0.1)', line=dict(color='rgba(255,255,255,0)'),
-                                                 hoverinfo="skip", showlegend=True, name="Forecast 95% CI"))
+        forecasts = _forecast_index(FORECASTS_PATH, os.path.getmtime(FORECASTS_PATH))
     except FileNotFoundError:
-        f_country = pd.DataFrame()
-
-    fig_co2.update_layout(title=f"CO2 emissions — {sel_country}", xaxis_title="Year", yaxis_title="CO2 (million tonnes)")
+        forecasts = {}
+    f_country = forecasts.get((sel_country, "co2"), pd.DataFrame())
+    if not f_country.empty:
+        # prediction columns: y_pred, y_lower, y_upper
+        if "y_pred" in f_country.columns and f_country["y_pred"].notna().any():
+            co2_traces.append(go.Scatter(x=f_country["year"], y=f_country["y_pred"], mode="lines", name="Forecast CO2", line=dict(dash="dash")))
+            if "y_lower" in f_country.columns and "y_upper" in f_country.columns:
+                # closed band: upper bound forward in time, lower bound back
+                band_years = f_country["year"].to_numpy()
+                co2_traces.append(go.Scatter(x=np.concatenate([band_years, band_years[::-1]]),
+                                             y=np.concatenate([f_country["y_upper"].to_numpy(), f_country["y_lower"].to_numpy()[::-1]]),
+                                             fill='toself', fillcolor='rgba(0,100,80,0.1)', line=dict(color='rgba(255,255,255,0)'),
+                                             hoverinfo="skip", showlegend=True, name="Forecast 95% CI"))
+    fig_co2 = go.Figure(data=co2_traces,
+                        layout=go.Layout(title=f"CO2 emissions — {sel_country}", xaxis_title="Year", yaxis_title="CO2 (million tonnes)"))
     st.plotly_chart(fig_co2, use_container_width=True)
 
     # Per-country GDP forecast (if GDP exists for this country)
     try:
         if "gdp" in cdf.columns and cdf["gdp"].notna().any():
-            fig_gdp = country_gdp_forecast_plot(df, sel_country, steps=steps)
+            fig_gdp = _gdp_forecast_figure(sel_country, steps, data_dir)
             st.subheader(f"GDP forecast — {sel_country}")
             st.plotly_chart(fig_gdp, use_container_width=True)
     except Exception as e:
@@ -113,15 +185,10 @@ def render_country_page(df: pd.DataFrame):
         st.plotly_chart(fig_pop, use_container_width=True)
 
     # Download enriched historical CSV
-    display_cols = ["year"]
-    for c in ("gdp", "co2", "co2_per_capita", "population"):
-        if c in cdf.columns:
-            display_cols.append(c)
-
     st.markdown("---")
     st.subheader("Country historical table")
-    st.dataframe(cdf[display_cols].fillna("n/a"))
-    csv = cdf[display_cols].to_csv(index=False)
+    st.dataframe(cdf.fillna("n/a"))
+    csv = _country_csv(sel_country, data_dir)
     st.download_button("Download country historical CSV", data=csv, file_name=f"{sel_country}_history.csv")
     # Forecasting is provided from the precomputed CSV `data/forecasts_co2.csv` above.
     # On-demand forecasting utilities were removed to keep the app dependent
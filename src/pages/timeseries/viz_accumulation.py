@@ -8,32 +8,19 @@ import plotly.express as px
 import plotly.graph_objects as go
 from typing import Optional, List
 
+from src.data_loader import country_mask
+
 
 def get_cumulative_emissions(df: pd.DataFrame, country: Optional[str] = None) -> pd.DataFrame:
     """Get cumulative CO2 emissions data.
 
     If `country` is provided, the result is filtered to that country.
-    Otherwise returns the full DataFrame (with cumulative cols coerced to numeric).
+    Otherwise returns the full DataFrame. The cumulative columns are already float
+    (typed by `load_data`), so no copy or coercion is made.
     """
-    data = df.copy()
-
     if country:
-        data = data[data["country"] == country]
-
-    # Common cumulative column names used in some datasets; coerce if present
-    cumulative_cols = [
-        "cumulative_co2",
-        "cumulative_co2_including_luc",
-        "cumulative_coal_co2",
-        "cumulative_oil_co2",
-        "cumulative_gas_co2",
-    ]
-
-    for col in cumulative_cols:
-        if col in data.columns:
-            data[col] = pd.to_numeric(data[col], errors="coerce")
-
-    return data
+        return df[df["country"] == country]
+    return df
 
 
 def plot_cumulative_trends(df: pd.DataFrame, countries: List[str]) -> Optional[go.Figure]:
@@ -45,13 +32,13 @@ def plot_cumulative_trends(df: pd.DataFrame, countries: List[str]) -> Optional[g
     if df is None or len(countries) == 0:
         return None
 
-    data = df.copy()
-    data = data.dropna(subset=["country", "year"])  # minimal requirements
+    # One row mask for the minimal requirements and the country selection; only the
+    # plotted columns of the selected rows are materialized
+    mask = df["country"].notna().to_numpy() & df["year"].notna().to_numpy() & country_mask(df, countries)
 
     # If dataset already contains cumulative columns, use them.
-    if "cumulative_co2" in data.columns:
-        data_filtered = data[data["country"].isin(countries)].copy()
-        data_filtered = data_filtered.dropna(subset=["cumulative_co2", "year"]).copy()
+    if "cumulative_co2" in df.columns:
+        data_filtered = df.loc[mask, ["country", "year", "cumulative_co2"]].dropna(subset=["cumulative_co2"])
         if data_filtered.empty:
             return None
 
@@ -75,16 +62,16 @@ def plot_cumulative_trends(df: pd.DataFrame, countries: List[str]) -> Optional[g
         return fig
 
     # Otherwise compute cumulative sums from annual `co2` values
-    if "co2" not in data.columns:
+    if "co2" not in df.columns:
         return None
 
-    data = data[data["country"].isin(countries)].copy()
-    data["co2"] = pd.to_numeric(data["co2"], errors="coerce").fillna(0)
+    data = df.loc[mask, ["country", "year", "co2"]]
+    data = data.assign(co2=data["co2"].fillna(0))
     # compute cumulative per country
-    data = data.sort_values(["country", "year"]).copy()
-    data["cum_co2"] = data.groupby("country")["co2"].cumsum()
+    data = data.sort_values(["country", "year"])
+    data = data.assign(cum_co2=data.groupby("country", observed=True)["co2"].cumsum())
 
-    data_filtered = data.dropna(subset=["cum_co2", "year"]).copy()
+    data_filtered = data.dropna(subset=["cum_co2", "year"])
     if data_filtered.empty:
         return None
 
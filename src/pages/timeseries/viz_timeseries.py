@@ -1,13 +1,15 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from typing import List
+from typing import List, Optional
+
+from src.data_loader import country_mask
 
 from .forecast import forecast_series
 
 
 def country_timeseries(df: pd.DataFrame, countries: List[str], metric: str = "co2_per_capita"):
-    ts_df = df[df["country"].isin(countries)].sort_values(["country", "year"])
+    ts_df = df[country_mask(df, countries)].sort_values(["country", "year"])
     if metric not in ts_df.columns:
         return None
     fig = px.line(ts_df, x="year", y=metric, color="country", markers=True,
@@ -15,7 +17,8 @@ def country_timeseries(df: pd.DataFrame, countries: List[str], metric: str = "co
     return fig
 
 
-def country_forecast_plot(df: pd.DataFrame, country: str, metric: str = "co2", steps: int = 5):
+def country_forecast_plot(df: pd.DataFrame, country: str, metric: str = "co2", steps: int = 5,
+                          forecast_df: Optional[pd.DataFrame] = None):
     """Create a Plotly figure showing historical data, forecast, and 95% CI for a single country.
 
     Args:
@@ -23,19 +26,22 @@ def country_forecast_plot(df: pd.DataFrame, country: str, metric: str = "co2", s
         country: Country name to filter.
         metric: Metric column to forecast.
         steps: Number of future years to predict.
+        forecast_df: Output of `forecast_series` for this country/metric, if already
+            computed; the model is only fitted when it is not given.
 
     Returns:
         plotly.graph_objects.Figure
     """
-    ts = df[df["country"] == country].sort_values("year")
-    if metric not in ts.columns:
-        raise ValueError(f"Metric '{metric}' not found in dataframe")
+    if forecast_df is None:
+        ts = df[df["country"] == country].sort_values("year")
+        if metric not in ts.columns:
+            raise ValueError(f"Metric '{metric}' not found in dataframe")
 
-    years = ts["year"].astype(int)
-    values = ts[metric]
+        years = ts["year"].astype(int)
+        values = ts[metric]
 
-    # Build forecast DataFrame
-    forecast_df = forecast_series(years, values, steps=steps)
+        # Build forecast DataFrame
+        forecast_df = forecast_series(years, values, steps=steps)
 
     # Historical portion
     hist_x = forecast_df[forecast_df["y"].notna()]["year"]
@@ -71,17 +77,22 @@ def country_forecast_plot(df: pd.DataFrame, country: str, metric: str = "co2", s
     return fig
 
 
-def global_forecast_plot(df: pd.DataFrame, metric: str = "co2", steps: int = 5):
+def global_forecast_plot(df: pd.DataFrame, metric: str = "co2", steps: int = 5,
+                         totals: Optional[pd.DataFrame] = None):
     """Aggregate `metric` across all countries by year, forecast, and return a Plotly figure.
 
     This produces the observed series (aggregated sum by year), a forecast for `steps` years,
-    and a 95% confidence interval filled area.
+    and a 95% confidence interval filled area. `totals` may pass precomputed per-year sums
+    (`year` and `metric` columns, e.g. from `yearly_totals`) to skip the aggregation.
     """
     if metric not in df.columns:
         raise ValueError(f"Metric '{metric}' not found in dataframe")
 
-    gdf = df.groupby("year", as_index=False)[metric].sum()
-    gdf = gdf.sort_values("year")
+    if totals is None:
+        gdf = df.groupby("year", as_index=False)[metric].sum()
+        gdf = gdf.sort_values("year")
+    else:
+        gdf = totals
 
     years = gdf["year"].astype(int)
     values = gdf[metric].astype(float)
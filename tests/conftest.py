@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Make the project's `src` package importable when pytest runs from the project root
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_loader import year_mask, year_slice, years_slice
+
+
+def _frame(years, sort: bool) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    years = np.asarray(years, dtype=np.int16)
+    rng.shuffle(years)
+    df = pd.DataFrame({"year": years, "value": np.arange(len(years))})
+    if sort:
+        df = df.sort_values("year", kind="stable")
+    return df
+
+
+def _expected(df: pd.DataFrame, years) -> pd.DataFrame:
+    return df[df["year"].isin(list(years))]
+
+
+# Every year 1990-1995 three times, 2000-2022 twice and a few isolated years, sorted and not
+YEARS = [*range(1990, 1996)] * 3 + [*range(2000, 2023)] * 2 + [1850, 1851, 2050]
+SELECTIONS = [
+    [2005],
+    [2000, 2001, 2002],
+    [2022, 2020, 2021],
+    [1990, 2000, 2020],
+    [1850, 2050],
+    [1995, 2000],
+    [1800, 1801],
+    [2100],
+    [1849, 1850],
+    [2022, 2023, 2024],
+    range(1850, 2051),
+    [],
+]
+
+
+@pytest.fixture(params=[True, False], ids=["sorted", "unsorted"])
+def df(request) -> pd.DataFrame:
+    return _frame(YEARS, sort=request.param)
+
+
+@pytest.mark.parametrize("years", SELECTIONS)
+def test_years_slice_matches_isin(df, years):
+    pd.testing.assert_frame_equal(years_slice(df, years), _expected(df, years))
+
+
+@pytest.mark.parametrize("years", SELECTIONS)
+def test_year_mask_matches_isin(df, years):
+    np.testing.assert_array_equal(year_mask(df, years), df["year"].isin(list(years)).to_numpy())
+
+
+@pytest.mark.parametrize("year", [1850, 1990, 2011, 2022, 2050, 1700, 2030])
+def test_year_slice_matches_equality(df, year):
+    pd.testing.assert_frame_equal(year_slice(df, year), df[df["year"] == year])
+
+
+def test_year_mask_non_integer_years():
+    df = pd.DataFrame({"year": [2000.0, 2001.0, 2002.0]})
+    assert year_mask(df, [2001]).tolist() == [False, True, False]
+
+
+def test_empty_frame():
+    df = pd.DataFrame({"year": np.array([], dtype=np.int16)})
+    assert years_slice(df, [2000, 2001]).empty
+    assert year_mask(df, [2000]).size == 0
+    assert year_slice(df, 2000).empty
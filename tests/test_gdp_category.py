@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.gdp_category import add_gdp_category
+
+
+def _quantile_categories(df: pd.DataFrame) -> pd.Series:
+    """Reference buckets: per-year `quantile(0.33)` / `quantile(0.66)` thresholds."""
+    out = pd.Series("Unknown", index=df.index, dtype=object)
+    for _, group in df.groupby("year"):
+        g = group["gdp"].dropna()
+        if g.empty:
+            continue
+        q1, q2 = g.quantile(0.33), g.quantile(0.66)
+        out[g.index] = np.where(g <= q1, "low", np.where(g <= q2, "mid", "high"))
+    return out
+
+
+def _frame(groups: dict) -> pd.DataFrame:
+    return pd.DataFrame(
+        [(year, v) for year, values in groups.items() for v in values],
+        columns=["year", "gdp"],
+    )
+
+
+def _assert_matches_quantiles(df: pd.DataFrame):
+    got = add_gdp_category(df)["gdp_category"]
+    expected = _quantile_categories(df)
+    pd.testing.assert_series_equal(got, expected, check_names=False, check_dtype=False)
+
+
+@pytest.mark.parametrize("values", [
+    [5.0],
+    [5.0, 7.0],
+    [7.0, 5.0, 6.0],
+    [1.0, 1.0],
+    [1.0, 1.0, 1.0],
+    [1.0, 2.0, 2.0, 3.0],
+    [3.0, 3.0, 1.0, 1.0, 2.0, 2.0],
+    [1.0, np.nan, 2.0, 3.0],
+    [np.nan, np.nan],
+])
+def test_small_and_tied_groups_match_quantile_tertiles(values):
+    _assert_matches_quantiles(_frame({2000: values}))
+
+
+@pytest.mark.parametrize("n", [34, 51, 67, 101, 151, 201, 301, 1001])
+def test_groups_with_integer_quantile_positions_match(n):
+    # (n - 1) * 0.33 or (n - 1) * 0.66 is a whole number, so a threshold lands exactly on
+    # an observed value
+    rng = np.random.default_rng(n)
+    values = rng.lognormal(mean=25, sigma=2, size=n)
+    _assert_matches_quantiles(_frame({2000: values, 2001: np.round(values, -11)}))
+
+
+def test_years_are_bucketed_independently():
+    rng = np.random.default_rng(0)
+    groups = {year: rng.integers(0, 20, size=size).astype(float)
+              for year, size in zip(range(2000, 2040), range(1, 41))}
+    df = _frame(groups).sample(frac=1.0, random_state=0)
+    _assert_matches_quantiles(df)
+
+
+def test_text_gdp_is_coerced():
+    df = pd.DataFrame({"year": [2000, 2000, 2000], "gdp": ["1", "n/a", "3"]})
+    assert add_gdp_category(df)["gdp_category"].tolist() == ["low", "Unknown", "high"]
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pytest
+
+from src.pages.overview.viz_sunburst import DEFAULT_GREEN_RED, SUNBURST_PATH, _value_sunburst
+
+
+def _nodes(trace) -> dict:
+    """Map each node id to its (label, parent, value, color); color is None when unset."""
+    colors = trace.marker.colors
+    out = {}
+    for i, node_id in enumerate(trace.ids):
+        color = float(colors[i]) if colors is not None and not pd.isna(colors[i]) else None
+        out[str(node_id)] = (str(trace.labels[i]), str(trace.parents[i]), float(trace.values[i]), color)
+    return out
+
+
+@pytest.fixture
+def agg() -> pd.DataFrame:
+    return pd.DataFrame({
+        "continent_name": ["Asia", "Asia", "Asia", "Europe", "Europe", "Europe", "Africa"],
+        "gdp_category": ["high", "high", "low", "mid", "mid", "low", "low"],
+        "country": ["China", "Japan", "Nepal", "France", "Spain", "Albania", "Chad"],
+        "co2": [11000.0, 1100.0, 15.0, 300.0, 250.0, 0.0, 0.0],
+    })
+
+
+def test_nodes_match_plotly_express(agg):
+    expected = px.sunburst(agg, path=SUNBURST_PATH, values="co2", color="co2",
+                           color_continuous_scale=DEFAULT_GREEN_RED).data[0]
+    got = _value_sunburst(agg, "co2", DEFAULT_GREEN_RED, "CO2 sunburst").data[0]
+
+    expected_nodes, got_nodes = _nodes(expected), _nodes(got)
+    assert got_nodes.keys() == expected_nodes.keys()
+    for node_id, (label, parent, value, color) in expected_nodes.items():
+        got_label, got_parent, got_value, got_color = got_nodes[node_id]
+        assert (got_label, got_parent) == (label, parent), node_id
+        assert got_value == pytest.approx(value), node_id
+        if color is None:
+            assert got_color is None, node_id
+        else:
+            assert got_color == pytest.approx(color), node_id
+    assert got.branchvalues == expected.branchvalues
+
+
+def test_parent_values_are_child_totals(agg):
+    trace = _value_sunburst(agg, "co2", DEFAULT_GREEN_RED, "CO2 sunburst").data[0]
+    nodes = _nodes(trace)
+    for node_id, (_, parent, value, _) in nodes.items():
+        children = [v for _, p, v, _ in nodes.values() if p == node_id]
+        if children:
+            assert value == pytest.approx(np.sum(children)), node_id
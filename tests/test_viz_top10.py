@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pages.overview.viz_top10 import _sum_by_country
+
+COLUMNS = ["co2", "gdp", "population"]
+
+
+def _frame(country_dtype=None) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "country": ["Chad", "Chad", "Peru", "Peru", "Fiji", "Fiji", None, "Oman"],
+        "co2": np.array([1.5, np.nan, 2.0, 3.0, np.nan, np.nan, 9.0, 0.0], dtype=np.float32),
+        "gdp": [10.0, 20.0, np.nan, np.nan, 5.0, np.nan, 1.0, 7.0],
+        "population": [100.0, 100.0, 50.0, np.nan, 10.0, 10.0, 1.0, np.nan],
+    })
+    if country_dtype is not None:
+        df["country"] = df["country"].astype(country_dtype)
+    return df
+
+
+def _expected(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby("country", as_index=False, observed=True)[COLUMNS].sum(min_count=1)
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.assign(country=df["country"].astype(str))
+    return out.sort_values("country").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("country_dtype", [
+    # unused categories ("Laos") have no rows and must not appear in the result
+    pd.CategoricalDtype(["Chad", "Fiji", "Laos", "Oman", "Peru"]),
+    None,
+])
+def test_matches_groupby_sum_min_count(country_dtype):
+    df = _frame(country_dtype)
+    got = _sum_by_country(df, COLUMNS)
+    pd.testing.assert_frame_equal(_sorted(got), _sorted(_expected(df)), check_dtype=False)
+
+
+def test_keeps_column_dtypes_and_category_order():
+    dtype = pd.CategoricalDtype(["Peru", "Oman", "Laos", "Fiji", "Chad"])
+    got = _sum_by_country(_frame(dtype), COLUMNS)
+    assert got["country"].tolist() == ["Peru", "Oman", "Fiji", "Chad"]
+    assert got["country"].dtype == dtype
+    assert got["co2"].dtype == np.float32
+    # a country whose values are all missing gets NaN, not 0
+    assert np.isnan(got.set_index("country").loc["Fiji", "co2"])
+
+
+def test_selection_without_rows():
+    df = _frame(pd.CategoricalDtype(["Chad", "Fiji", "Oman", "Peru"])).iloc[:0]
+    got = _sum_by_country(df, COLUMNS)
+    assert got.empty
+    assert list(got.columns) == ["country", *COLUMNS]